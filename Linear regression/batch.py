@@ -0,0 +1,191 @@
+"""Пакетная генерация отчетов: много CSV за один запуск.
+
+Каждый файл обучается и превращается в HTML отчет в отдельном процессе
+пула; браузер не открывается. В каталог назначения пишутся отчеты,
+index.html со ссылками на них, метриками R²/MSE и размером отчета, а также
+report_manifest.jsonl с размером и временем записи каждого отчета. Отчеты
+можно писать заранее сжатыми и с общими CSS/JS (см. report.py).
+
+    python student_score.py --batch 'cohorts/*.csv' --output-dir reports
+"""
+
+import glob
+import html
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+from report import ASSETS_DIRNAME, append_manifest, write_assets
+
+INDEX_FILENAME = 'index.html'
+INPUT_EXTENSIONS = ('.csv', '.parquet', '.pq', '.arrow', '.feather', '.ipc')
+
+INDEX_TEMPLATE = """<!DOCTYPE html>
+<html lang="ru">
+<head>
+    <meta charset="UTF-8">
+    <meta name="viewport" content="width=device-width, initial-scale=1.0">
+    <title>Student Scores - Reports</title>
+    <style>
+        body {{ font-family: 'Segoe UI', Tahoma, Geneva, Verdana, sans-serif; background: #f4f5fb; padding: 20px; }}
+        .container {{ max-width: 1100px; margin: 0 auto; background: #fff; border-radius: 15px; padding: 30px; box-shadow: 0 10px 30px rgba(0,0,0,0.1); }}
+        h1 {{ color: #667eea; margin-bottom: 10px; }}
+        table {{ width: 100%; border-collapse: collapse; margin-top: 20px; }}
+        th {{ background: #667eea; color: #fff; padding: 10px; text-align: left; }}
+        td {{ padding: 8px 10px; border-bottom: 1px solid #eee; }}
+        td.number {{ text-align: right; font-variant-numeric: tabular-nums; }}
+        tr.failed td {{ color: #c0392b; }}
+    </style>
+</head>
+<body>
+    <div class="container">
+        <h1>📊 Отчеты по линейной регрессии</h1>
+        <p>Отчетов: <strong>{count}</strong>{failed_note}</p>
+        <table>
+            <thead>
+                <tr>
+                    <th>Данные</th>
+                    <th>Строк</th>
+                    <th>R² Score</th>
+                    <th>MSE</th>
+                    <th>Уравнение</th>
+                    <th>Размер, КБ</th>
+                </tr>
+            </thead>
+            <tbody>{rows}
+            </tbody>
+        </table>
+    </div>
+</body>
+</html>
+"""
+INDEX_ROW_TEMPLATE = """
+                <tr>
+                    <td><a href="{href}">{name}</a></td>
+                    <td class="number">{rows}</td>
+                    <td class="number">{r2:.4f}</td>
+                    <td class="number">{mse:.2f}</td>
+                    <td>y = {slope:.2f}x + {intercept:.2f}</td>
+                    <td class="number">{bytes_kb:.1f}</td>
+                </tr>"""
+INDEX_ERROR_ROW_TEMPLATE = """
+                <tr class="failed">
+                    <td>{name}</td>
+                    <td colspan="5">⚠️ {error}</td>
+                </tr>"""
+
+
+def expand_inputs(pattern):
+    """Файлы данных: поддерживаемые файлы каталога или совпадения glob-шаблона."""
+    if os.path.isdir(pattern) and not os.path.exists(os.path.join(pattern, 'Hours.npy')):
+        entries = [os.path.join(pattern, name) for name in os.listdir(pattern)]
+        # Каталоги с Hours.npy внутри — тоже данные (формат npy)
+        paths = [path for path in entries if path.lower().endswith(INPUT_EXTENSIONS)
+                 or os.path.exists(os.path.join(path, 'Hours.npy'))]
+    else:
+        paths = glob.glob(pattern)
+    return sorted(paths)
+
+
+def report_names(paths):
+    """Имена HTML отчетов по именам файлов; повторы получают суффикс."""
+    names, seen = [], {}
+    for path in paths:
+        stem = os.path.splitext(os.path.basename(os.path.normpath(path)))[0]
+        count = seen.get(stem, 0)
+        seen[stem] = count + 1
+        names.append(f"{stem}.html" if count == 0 else f"{stem}_{count}.html")
+    return names
+
+
+def _run_one(task):
+    # Задача процесса пула: обучение, отчет, запись; ошибка не останавливает пакет
+    path, report_path, options = task
+    from model_cache import ModelCache
+    from readers import load_columns
+    from regression_stats import RANDOM_STATE, TEST_SIZE
+    from report import build_html, write_report_file
+    from robust import engine_label
+    from student_score import fit_in_memory
+
+    summary = {'source': path, 'report': os.path.basename(report_path)}
+    try:
+        cache = None if options['no_cache'] else ModelCache(options['cache_dir'], options['cache_size'])
+        model = engine_label(options['engine'], **options['engine_options'])
+        cache_key = (cache.key_for(path, TEST_SIZE, RANDOM_STATE, options['split'], model, options['compact'])
+                     if cache else None)
+        result = cache.get(cache_key) if cache else None
+        test_mask = None
+        if result is not None:
+            hours, scores = load_columns(path, compact=options['compact'])
+        else:
+            hours, scores, result, test_mask = fit_in_memory(path, options['engine'], options['split'],
+                                                             options['engine_options'], options['compact'])
+            if cache:
+                cache.put(cache_key, result, path)
+        html_content = build_html(hours, scores, result, options['max_points'],
+                                  assets_url=ASSETS_DIRNAME if options['external_assets'] else None,
+                                  split=options['split'], engine=options['engine'], test_mask=test_mask)
+        info = write_report_file(html_content, report_path, options['compress'])
+    except Exception as e:
+        summary['error'] = f"{type(e).__name__}: {e}"
+        return summary
+    summary.update(rows=len(hours), r2=float(result.r2), mse=float(result.mse),
+                   slope=float(result.slope), intercept=float(result.intercept), write=info)
+    return summary
+
+
+def render_index(summaries):
+    rows = []
+    for summary in summaries:
+        name = html.escape(os.path.basename(os.path.normpath(summary['source'])))
+        if 'error' in summary:
+            rows.append(INDEX_ERROR_ROW_TEMPLATE.format(name=name, error=html.escape(summary['error'])))
+        else:
+            # Сжатый отчет report.html.gz веб-сервер отдает по адресу report.html
+            rows.append(INDEX_ROW_TEMPLATE.format(href=html.escape(summary['report']), name=name,
+                                                  bytes_kb=summary['write']['bytes'] / 1024, **{
+                key: summary[key] for key in ('rows', 'r2', 'mse', 'slope', 'intercept')}))
+    failed = sum('error' in summary for summary in summaries)
+    failed_note = f" (с ошибкой: <strong>{failed}</strong>)" if failed else ""
+    return INDEX_TEMPLATE.format(count=len(summaries) - failed, failed_note=failed_note, rows="".join(rows))
+
+
+def run_batch(paths, output_dir, workers=None, engine='closed-form', max_points=None,
+              cache_dir='.model_cache', cache_size=64, no_cache=False, split='random', engine_options=None,
+              compress=None, external_assets=False, compact=True):
+    """Строит отчеты для paths в пуле процессов; возвращает сводки в порядке paths."""
+    os.makedirs(output_dir, exist_ok=True)
+    if external_assets:
+        # Общие CSS/JS пишутся один раз на каталог, а не в каждом процессе
+        write_assets(os.path.join(output_dir, ASSETS_DIRNAME), compress)
+    options = {'engine': engine, 'max_points': max_points, 'cache_dir': cache_dir,
+               'cache_size': cache_size, 'no_cache': no_cache, 'split': split,
+               'engine_options': engine_options or {}, 'compress': compress,
+               'external_assets': external_assets, 'compact': compact}
+    tasks = [(path, os.path.join(output_dir, name), options)
+             for path, name in zip(paths, report_names(paths))]
+    workers = min(workers or os.cpu_count() or 1, max(len(tasks), 1))
+    if workers == 1:
+        summaries = list(map(_run_one, tasks))
+    else:
+        with ProcessPoolExecutor(workers) as pool:
+            summaries = list(pool.map(_run_one, tasks, chunksize=max(1, len(tasks) // (4 * workers))))
+
+    for summary in summaries:
+        if 'write' in summary:
+            append_manifest(output_dir, summary['write'])
+    with open(os.path.join(output_dir, INDEX_FILENAME), 'w', encoding='utf-8') as f:
+        f.write(render_index(summaries))
+    return summaries
+
+
+def print_batch(summaries, output_dir):
+    failed = [summary for summary in summaries if 'error' in summary]
+    print("=" * 50)
+    print("ПАКЕТНАЯ ГЕНЕРАЦИЯ ОТЧЕТОВ")
+    print("=" * 50)
+    print(f"Отчетов создано: {len(summaries) - len(failed)}")
+    for summary in failed:
+        print(f"⚠️ {summary['source']}: {summary['error']}")
+    print("=" * 50)
+    print(f"\n✅ Сводная страница: {os.path.join(output_dir, INDEX_FILENAME)}")
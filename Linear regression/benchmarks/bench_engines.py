@@ -0,0 +1,105 @@
+"""Ridge, Huber и RANSAC рядом с МНК на данных с выбросами.
+
+Синтетические данные (оценка ≈ 9.8 * часы + 2) с долей выбросов «20 часов —
+0 баллов» пишутся в каталог npy и читаются через memmap, как
+`--data <каталог>`. Для каждого способа обучения замеряются время, число
+проходов по данным, пик выделенной памяти (tracemalloc) и отклонение
+наклона от истинного. Для сравнения те же модели обучаются sklearn
+(LinearRegression, Ridge, HuberRegressor, RANSACRegressor) на данных в памяти.
+
+    python benchmarks/bench_engines.py --sizes 100000 1000000 10000000 --outliers 0.05
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from readers import read_npy  # noqa: E402
+from regression_stats import RANDOM_STATE, TEST_SIZE, fit_arrays, sklearn_test_mask  # noqa: E402
+from robust import ROBUST_ENGINES, ArraySource, fit_engine  # noqa: E402
+
+TRUE_SLOPE = 9.8
+
+
+def write_data(directory, n_rows, outliers, seed=0):
+    rng = np.random.default_rng(seed)
+    hours = np.round(rng.uniform(0, 10, n_rows), 1)
+    scores = np.clip(np.rint(TRUE_SLOPE * hours + 2 + rng.normal(0, 5, n_rows)), 0, 100)
+    bad = rng.random(n_rows) < outliers
+    hours[bad] = 20.0
+    scores[bad] = 0.0
+    np.save(os.path.join(directory, 'Hours.npy'), hours)
+    np.save(os.path.join(directory, 'Scores.npy'), scores.astype(np.int64))
+
+
+def ols(hours, scores, test_mask):
+    return fit_arrays(hours, scores, test_mask), 1
+
+
+def engine_runner(engine):
+    def run(hours, scores, test_mask):
+        source = ArraySource(hours, scores, test_mask)
+        return fit_engine(engine, source), source.passes
+    return run
+
+
+def sklearn_runner(engine):
+    # Импорт sklearn — вне замера
+    from sklearn.linear_model import HuberRegressor, LinearRegression, RANSACRegressor, Ridge
+
+    def run(hours, scores, test_mask):
+        models = {'ols': LinearRegression(), 'ridge': Ridge(), 'huber': HuberRegressor(),
+                  'ransac': RANSACRegressor(random_state=RANDOM_STATE)}
+        model = models[engine]
+        model.fit(np.asarray(hours[~test_mask], dtype=np.float64)[:, None], scores[~test_mask])
+        fitted = getattr(model, 'estimator_', model)
+        return fitted.coef_[0], None
+    return run
+
+
+def measure(func, hours, scores, test_mask):
+    start = time.perf_counter()
+    tracemalloc.start()
+    result, passes = func(hours, scores, test_mask)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    seconds = time.perf_counter() - start
+    slope = float(getattr(result, 'slope', result))
+    return seconds, passes, peak, slope
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--sizes', type=int, nargs='+', default=[100_000, 1_000_000])
+    parser.add_argument('--outliers', type=float, default=0.05, help="доля выбросов (по умолчанию %(default)s)")
+    parser.add_argument('--sklearn-max-rows', type=int, default=1_000_000,
+                        help="sklearn не запускается на данных больше этого размера")
+    args = parser.parse_args(argv)
+
+    print(f"{'способ':<14} | {'строк':>10} | {'время, с':>9} | {'проходов':>8} | {'пик, МБ':>8} | "
+          f"{'наклон':>8} | {'ошибка наклона':>14}")
+    for n_rows in args.sizes:
+        with tempfile.TemporaryDirectory() as directory:
+            write_data(directory, n_rows, args.outliers)
+            hours, scores = read_npy(directory)
+            test_mask = sklearn_test_mask(n_rows, TEST_SIZE, RANDOM_STATE)
+            runs = [('ols', ols)] + [(engine, engine_runner(engine)) for engine in ROBUST_ENGINES]
+            if n_rows <= args.sklearn_max_rows:
+                runs += [(f'sklearn {engine}', sklearn_runner(engine)) for engine in ('ols', *ROBUST_ENGINES)]
+            for name, func in runs:
+                seconds, passes, peak, slope = measure(func, hours, scores, test_mask)
+                passes = '—' if passes is None else passes
+                print(f"{name:<14} | {n_rows:>10} | {seconds:>9.4f} | {passes:>8} | {peak / 2**20:>8.1f} | "
+                      f"{slope:>8.4f} | {abs(slope - TRUE_SLOPE):>14.4f}")
+            del hours, scores
+
+
+if __name__ == '__main__':
+    main()
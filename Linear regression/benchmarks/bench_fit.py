@@ -0,0 +1,73 @@
+"""Сравнение обучения через sklearn и в закрытой форме по суммам.
+
+Для каждого размера синтетических данных замеряются время и пик выделенной
+памяти (tracemalloc) полного шага «разбиение → обучение → метрики», а также
+расхождение результатов двух способов.
+
+    python benchmarks/bench_fit.py --sizes 100000 1000000 10000000
+"""
+
+import argparse
+import os
+import sys
+import time
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from regression_stats import RANDOM_STATE, TEST_SIZE, fit_arrays, sklearn_test_mask  # noqa: E402
+from student_score import fit_sklearn  # noqa: E402
+
+
+def make_data(n_rows, seed=0):
+    rng = np.random.default_rng(seed)
+    hours = np.round(rng.uniform(0, 10, n_rows), 1)
+    scores = np.clip(np.round(hours * 10 + rng.normal(0, 5, n_rows)), 0, 100).astype(np.int64)
+    return pd.DataFrame({'Hours': hours, 'Scores': scores})
+
+
+def sklearn(df):
+    return fit_sklearn(df['Hours'].to_numpy(), df['Scores'].to_numpy())
+
+
+def closed_form(df):
+    test_mask = sklearn_test_mask(len(df), TEST_SIZE, RANDOM_STATE)
+    return fit_arrays(df['Hours'].to_numpy(), df['Scores'].to_numpy(), test_mask)
+
+
+def measure(func, df, repeat):
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func(df)
+        best = min(best, time.perf_counter() - start)
+    tracemalloc.start()
+    func(df)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, best, peak
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--sizes', type=int, nargs='+', default=[10_000, 100_000, 1_000_000])
+    parser.add_argument('--repeat', type=int, default=3, help="повторов для лучшего времени")
+    args = parser.parse_args(argv)
+
+    print(f"{'строк':>10} | {'sklearn, с':>10} | {'формулы, с':>10} | {'ускорение':>9} | "
+          f"{'sklearn, МБ':>11} | {'формулы, МБ':>11} | {'макс. расхождение':>17}")
+    for n_rows in args.sizes:
+        df = make_data(n_rows)
+        expected, sk_time, sk_peak = measure(sklearn, df, args.repeat)
+        actual, cf_time, cf_peak = measure(closed_form, df, args.repeat)
+        diff = max(abs(float(getattr(expected, name)) - float(getattr(actual, name)))
+                   for name in ('slope', 'intercept', 'r2', 'mse'))
+        print(f"{n_rows:>10} | {sk_time:>10.4f} | {cf_time:>10.4f} | {sk_time / cf_time:>8.1f}x | "
+              f"{sk_peak / 2**20:>11.1f} | {cf_peak / 2**20:>11.1f} | {diff:>17.2e}")
+
+
+if __name__ == '__main__':
+    main()
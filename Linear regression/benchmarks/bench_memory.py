@@ -0,0 +1,112 @@
+"""Пиковая память загрузки и обучения: float64/int64 против компактных типов.
+
+Для каждого размера данных CSV читается дважды — с --no-compact (колонки
+float64/int64, 16 байт на строку) и по умолчанию (часы float32, оценки
+uint8, 5 байт на строку), — затем модель обучается в закрытой форме с
+разбиением train/test. Каждый прогон идет в отдельном процессе. Пиковый RSS
+(VmHWM) сбрасывается после импортов, так что пик импортов не заслоняет
+загрузку; без /proc (macOS) пик считается от ru_maxrss после импортов.
+
+    python benchmarks/bench_memory.py --sizes 1e6 1e7
+"""
+
+import argparse
+import json
+import os
+import resource
+import subprocess
+import sys
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(BENCH_DIR))
+sys.path.insert(0, BENCH_DIR)
+
+MODES = ('float64', 'compact')
+
+
+def _proc_status(field):
+    try:
+        with open('/proc/self/status', encoding='ascii') as f:
+            for line in f:
+                if line.startswith(field + ':'):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    return None
+
+
+def reset_peak():
+    """Сбрасывает VmHWM до текущего RSS (Linux); возвращает RSS, от которого считать пик."""
+    try:
+        with open('/proc/self/clear_refs', 'w', encoding='ascii') as f:
+            f.write('5')
+    except OSError:
+        pass
+    current = _proc_status('VmRSS')
+    return peak_rss() if current is None else current
+
+
+def peak_rss():
+    peak = _proc_status('VmHWM')
+    if peak is not None:
+        return peak
+    # ru_maxrss в Linux — КиБ, в macOS — байты
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return rss if sys.platform == 'darwin' else rss * 1024
+
+
+def worker(mode, path):
+    """Один прогон в текущем процессе; печатает JSON с результатами."""
+    import pandas  # noqa: F401  — импорт pandas не должен попасть в замер загрузки
+
+    from readers import load_columns
+    from regression_stats import RANDOM_STATE, TEST_SIZE, fit_arrays, sklearn_test_mask
+
+    before = reset_peak()
+    hours, scores = load_columns(path, compact=mode == 'compact')
+    loaded = peak_rss()
+    result = fit_arrays(hours, scores, sklearn_test_mask(len(hours), TEST_SIZE, RANDOM_STATE))
+    after = peak_rss()
+    print(json.dumps({
+        'mode': mode,
+        'rows': len(hours),
+        'dtypes': f"{hours.dtype}/{scores.dtype}",
+        'column_bytes': hours.nbytes + scores.nbytes,
+        'load_rss': loaded - before,
+        'peak_rss': after - before,
+        'slope': float(result.slope),
+    }))
+
+
+def run_isolated(mode, path):
+    cmd = [sys.executable, os.path.abspath(__file__), '--worker', mode, path]
+    proc = subprocess.run(cmd, capture_output=True, text=True, check=True)
+    return json.loads(proc.stdout.strip().splitlines()[-1])
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--sizes', type=float, nargs='+', default=[1e5, 1e6],
+                        help="размеры данных в строках (по умолчанию 1e5 1e6)")
+    parser.add_argument('--worker', nargs=2, metavar=('MODE', 'CSV'), help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.worker:
+        worker(*args.worker)
+        return
+
+    from bench_pipeline import ensure_data
+
+    print(f"{'режим':<8} | {'строк':>10} | {'типы':>15} | {'колонки, МБ':>11} | {'пик загрузки, МБ':>16} | "
+          f"{'пик, МБ':>8} | {'МБ на 1e6 строк':>15} | {'наклон':>10}")
+    for n_rows in sorted(int(size) for size in args.sizes):
+        path = ensure_data(n_rows)
+        for mode in MODES:
+            run = run_isolated(mode, path)
+            print(f"{mode:<8} | {run['rows']:>10} | {run['dtypes']:>15} | {run['column_bytes'] / 2**20:>11.1f} | "
+                  f"{run['load_rss'] / 2**20:>16.1f} | {run['peak_rss'] / 2**20:>8.1f} | "
+                  f"{run['peak_rss'] / 2**20 / run['rows'] * 1e6:>15.1f} | {run['slope']:>10.6f}")
+
+
+if __name__ == '__main__':
+    main()
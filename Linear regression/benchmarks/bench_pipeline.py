@@ -0,0 +1,233 @@
+"""Бенчмарк конвейера student_score.py по этапам на данных разного размера.
+
+Для каждого размера (1e3 ... 1e8 строк) и способа обучения замеряется время
+этапов: загрузка CSV, разбиение, обучение, предсказание, метрики, сборка
+HTML и запись файла, а также пиковый RSS процесса. Каждый прогон идет в
+отдельном процессе, чтобы пик памяти не накапливался между размерами.
+Результаты пишутся в JSON и сравниваются с сохраненным baseline.
+
+    python benchmarks/bench_pipeline.py --sizes 1e3 1e4 1e5 1e6
+    python benchmarks/bench_pipeline.py --sizes 1e6 1e7 --save-baseline
+"""
+
+import argparse
+import json
+import os
+import platform
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from contextlib import contextmanager
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(BENCH_DIR))
+
+DATA_DIR = os.path.join(BENCH_DIR, 'data')
+RESULTS_DIR = os.path.join(BENCH_DIR, 'results')
+BASELINE_PATH = os.path.join(BENCH_DIR, 'baseline.json')
+
+STAGES = ('load', 'split', 'fit', 'predict', 'metrics', 'html', 'write')
+ENGINES = ('closed-form', 'sklearn')
+
+
+class StageTimer:
+    def __init__(self):
+        self.timings = {}
+
+    @contextmanager
+    def stage(self, name):
+        start = time.perf_counter()
+        yield
+        self.timings[name] = time.perf_counter() - start
+
+
+def run_closed_form(path, timer, report_max_points):
+    # Те же функции, что в student_score.fit_in_memory: предсказания тестовой
+    # выборки не строятся, метрики считаются по суммам внутри fit_arrays (входят
+    # в fit). В load входит ленивый импорт pandas для файлов больше
+    # readers.SMALL_FILE_BYTES
+    from regression_stats import RANDOM_STATE, TEST_SIZE, fit_arrays, test_mask_for
+    from readers import load_columns
+
+    with timer.stage('load'):
+        hours, scores = load_columns(path)
+    with timer.stage('split'):
+        test_mask = test_mask_for(len(hours), 'random', TEST_SIZE, RANDOM_STATE)
+    with timer.stage('fit'):
+        result = fit_arrays(hours, scores, test_mask)
+    return hours, scores, result, test_mask
+
+
+def run_sklearn(path, timer, report_max_points):
+    import pandas as pd
+    from sklearn.linear_model import LinearRegression
+    from sklearn.metrics import mean_squared_error, r2_score
+    from sklearn.model_selection import train_test_split
+
+    from regression_stats import RANDOM_STATE, TEST_SIZE, FitResult
+
+    with timer.stage('load'):
+        df = pd.read_csv(path)
+    with timer.stage('split'):
+        X_train, X_test, y_train, y_test = train_test_split(
+            df[['Hours']], df['Scores'], test_size=TEST_SIZE, random_state=RANDOM_STATE)
+    with timer.stage('fit'):
+        model = LinearRegression()
+        model.fit(X_train, y_train)
+    with timer.stage('predict'):
+        y_pred = model.predict(X_test)
+    with timer.stage('metrics'):
+        r2 = r2_score(y_test, y_pred)
+        mse = mean_squared_error(y_test, y_pred)
+    result = FitResult(model.coef_[0], model.intercept_, r2, mse, len(X_train), len(X_test))
+    return df['Hours'].to_numpy(), df['Scores'].to_numpy(), result, None
+
+
+def worker(engine, path, report_max_points):
+    """Один прогон в текущем процессе; печатает JSON с результатами."""
+    from report import build_html
+
+    timer = StageTimer()
+    run = run_closed_form if engine == 'closed-form' else run_sklearn
+    hours, scores, result, test_mask = run(path, timer, report_max_points)
+    max_points = report_max_points if len(hours) > report_max_points else None
+    with timer.stage('html'):
+        html_content = build_html(hours, scores, result, max_points, test_mask=test_mask)
+    with tempfile.TemporaryDirectory() as tmp:
+        with timer.stage('write'):
+            with open(os.path.join(tmp, 'regression_report.html'), 'w', encoding='utf-8') as f:
+                f.write(html_content)
+    # ru_maxrss в Linux — КиБ, в macOS — байты
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    peak_rss = rss if sys.platform == 'darwin' else rss * 1024
+    print(json.dumps({
+        'engine': engine,
+        'rows': len(hours),
+        'stages': {name: timer.timings.get(name) for name in STAGES},
+        'total': sum(timer.timings.values()),
+        'peak_rss': peak_rss,
+        'html_bytes': len(html_content.encode('utf-8')),
+        'r2': float(result.r2),
+    }))
+
+
+def ensure_data(n_rows):
+    from generate_data import generate_csv
+
+    os.makedirs(DATA_DIR, exist_ok=True)
+    path = os.path.join(DATA_DIR, f'scores_{n_rows}.csv')
+    if not os.path.exists(path):
+        print(f"Генерация {n_rows} строк -> {path}", file=sys.stderr)
+        generate_csv(path + '.tmp', n_rows)
+        os.replace(path + '.tmp', path)
+    return path
+
+
+def run_isolated(engine, path, report_max_points):
+    cmd = [sys.executable, os.path.abspath(__file__), '--worker', engine, path,
+           '--report-max-points', str(report_max_points)]
+    proc = subprocess.run(cmd, capture_output=True, text=True, check=True)
+    return json.loads(proc.stdout.strip().splitlines()[-1])
+
+
+def _key(run):
+    return f"{run['engine']}:{run['rows']}"
+
+
+def compare(runs, baseline, threshold):
+    """Печатает отношение к baseline; возвращает список регрессий."""
+    base_runs = {_key(run): run for run in baseline.get('runs', [])}
+    regressions = []
+    print(f"\nСравнение с baseline ({baseline.get('created', '?')}), порог {threshold:.2f}x:")
+    for run in runs:
+        base = base_runs.get(_key(run))
+        if base is None:
+            print(f"  {_key(run):<22} нет в baseline")
+            continue
+        checks = [('total', run['total'], base['total']), ('peak_rss', run['peak_rss'], base['peak_rss'])]
+        checks += [(name, run['stages'][name], base['stages'].get(name)) for name in STAGES]
+        parts = []
+        for name, current, previous in checks:
+            if not current or not previous:
+                continue
+            ratio = current / previous
+            if name in ('total', 'peak_rss'):
+                parts.append(f"{name} {ratio:.2f}x")
+            if ratio > threshold:
+                regressions.append((_key(run), name, ratio))
+        print(f"  {_key(run):<22} " + ", ".join(parts))
+    for key, name, ratio in regressions:
+        print(f"  ⚠️ регрессия: {key} {name} {ratio:.2f}x")
+    return regressions
+
+
+def print_table(runs):
+    header = f"{'способ':<12} | {'строк':>10} | " + " | ".join(f"{name:>8}" for name in STAGES)
+    print(header + f" | {'всего, с':>8} | {'RSS, МБ':>8}")
+    for run in runs:
+        cells = " | ".join(f"{run['stages'][name]:>8.4f}" if run['stages'][name] is not None else f"{'—':>8}"
+                           for name in STAGES)
+        print(f"{run['engine']:<12} | {run['rows']:>10} | {cells} | {run['total']:>8.3f} | "
+              f"{run['peak_rss'] / 2**20:>8.1f}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Бенчмарк конвейера student_score.py по этапам")
+    parser.add_argument('--sizes', type=float, nargs='+', default=[1e3, 1e4, 1e5, 1e6],
+                        help="размеры данных в строках (по умолчанию 1e3 1e4 1e5 1e6)")
+    parser.add_argument('--engines', nargs='+', choices=ENGINES, default=list(ENGINES))
+    parser.add_argument('--sklearn-max-rows', type=float, default=1e7,
+                        help="sklearn не запускается на данных больше этого размера")
+    parser.add_argument('--report-max-points', type=int, default=20_000,
+                        help="для данных больше этого размера отчет строится с --max-points")
+    parser.add_argument('--output', help="JSON с результатами (по умолчанию results/<время>.json)")
+    parser.add_argument('--baseline', default=BASELINE_PATH)
+    parser.add_argument('--save-baseline', action='store_true', help="сохранить результаты как baseline")
+    parser.add_argument('--threshold', type=float, default=1.25, help="порог регрессии относительно baseline")
+    parser.add_argument('--fail-on-regression', action='store_true', help="код выхода 1 при регрессии")
+    parser.add_argument('--worker', nargs=2, metavar=('ENGINE', 'CSV'), help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.worker:
+        worker(args.worker[0], args.worker[1], args.report_max_points)
+        return
+
+    runs = []
+    for n_rows in sorted(int(size) for size in args.sizes):
+        path = ensure_data(n_rows)
+        for engine in args.engines:
+            if engine == 'sklearn' and n_rows > args.sklearn_max_rows:
+                continue
+            runs.append(run_isolated(engine, path, args.report_max_points))
+    print_table(runs)
+
+    results = {
+        'created': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'python': platform.python_version(),
+        'machine': platform.machine(),
+        'cpu_count': os.cpu_count(),
+        'runs': runs,
+    }
+    output = args.output
+    if output is None:
+        os.makedirs(RESULTS_DIR, exist_ok=True)
+        output = os.path.join(RESULTS_DIR, time.strftime('%Y%m%d-%H%M%S') + '.json')
+    with open(output, 'w', encoding='utf-8') as f:
+        json.dump(results, f, indent=2)
+    print(f"\nРезультаты: {output}")
+
+    if args.save_baseline:
+        with open(args.baseline, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2)
+        print(f"Baseline сохранен: {args.baseline}")
+    elif os.path.exists(args.baseline):
+        with open(args.baseline, encoding='utf-8') as f:
+            regressions = compare(runs, json.load(f), args.threshold)
+        if regressions and args.fail_on_regression:
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,63 @@
+"""Параллельный разбор CSV по частям: скорость в зависимости от числа процессов.
+
+Для каждого размера данных модель обучается последовательным --stream
+(fit_streaming) и параллельным (shards.fit_sharded) с разным числом
+процессов. Печатаются время, строк в секунду, ускорение относительно
+последовательного режима и совпадают ли результаты до бита. Файл
+прочитывается один раз до замеров, чтобы он был в кэше страниц: так
+замеряется разбор, а не диск.
+
+    python benchmarks/bench_shards.py --sizes 1e7 --workers 1 2 4 8 16 32
+"""
+
+import argparse
+import os
+import sys
+import time
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(BENCH_DIR))
+sys.path.insert(0, BENCH_DIR)
+
+from bench_pipeline import ensure_data  # noqa: E402
+from regression_stats import fit_streaming  # noqa: E402
+from shards import fit_sharded  # noqa: E402
+
+
+def warm_cache(path, block_size=1 << 24):
+    with open(path, 'rb') as f:
+        while f.read(block_size):
+            pass
+
+
+def timed(func, *args, **kwargs):
+    start = time.perf_counter()
+    result = func(*args, **kwargs)
+    return result, time.perf_counter() - start
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--sizes', type=float, nargs='+', default=[1e6, 1e7],
+                        help="размеры данных в строках (по умолчанию 1e6 1e7)")
+    parser.add_argument('--workers', type=int, nargs='+', default=[1, 2, 4, os.cpu_count() or 1],
+                        help="числа процессов (по умолчанию 1 2 4 и число ядер)")
+    parser.add_argument('--split', choices=('random', 'hash'), default='random')
+    args = parser.parse_args(argv)
+    import pandas  # noqa: F401  — импорт pandas вне замера последовательного режима
+
+    print(f"{'режим':<12} | {'строк':>10} | {'время, с':>9} | {'строк/с':>12} | {'ускорение':>9} | {'совпадает':>9}")
+    for n_rows in sorted(int(size) for size in args.sizes):
+        path = ensure_data(n_rows)
+        warm_cache(path)
+        serial, serial_seconds = timed(fit_streaming, path, split=args.split)
+        print(f"{'serial':<12} | {n_rows:>10} | {serial_seconds:>9.3f} | {n_rows / serial_seconds:>12,.0f} | "
+              f"{1:>9.2f} | {'—':>9}")
+        for workers in sorted(set(args.workers)):
+            result, seconds = timed(fit_sharded, path, workers, split=args.split)
+            print(f"{f'workers={workers}':<12} | {n_rows:>10} | {seconds:>9.3f} | {n_rows / seconds:>12,.0f} | "
+                  f"{serial_seconds / seconds:>9.2f} | {'да' if result == serial else 'НЕТ':>9}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,72 @@
+"""Время запуска student_score.py и импортируемые модули (python -X importtime).
+
+Каждый сценарий запускается в отдельном процессе во временном каталоге;
+выводятся медиана полного времени, суммарное время импортов и были ли
+импортированы pandas и sklearn.
+
+    python benchmarks/bench_startup.py --runs 5
+"""
+
+import argparse
+import os
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+SCRIPT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SCRIPT = os.path.join(SCRIPT_DIR, 'student_score.py')
+
+SCENARIOS = (
+    ('маленький CSV, без кэша', ['--no-cache']),
+    ('маленький CSV, попадание в кэш', []),
+    ('--engine sklearn, без кэша', ['--no-cache', '--engine', 'sklearn']),
+)
+
+
+def parse_importtime(stderr):
+    """Возвращает (суммарное время импортов в секундах, множество модулей)."""
+    total_us = 0
+    modules = set()
+    for line in stderr.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        self_us, _, name = line[len('import time:'):].split('|')
+        total_us += int(self_us)
+        modules.add(name.strip())
+    return total_us / 1e6, modules
+
+
+def run_once(workdir, data, extra):
+    cmd = [sys.executable, '-X', 'importtime', SCRIPT, '--data', data, '--no-browser'] + extra
+    start = time.perf_counter()
+    proc = subprocess.run(cmd, cwd=workdir, capture_output=True, text=True, check=True)
+    wall = time.perf_counter() - start
+    import_time, modules = parse_importtime(proc.stderr)
+    return wall, import_time, modules
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--data', default=os.path.join(SCRIPT_DIR, 'student_scores.csv'))
+    parser.add_argument('--runs', type=int, default=5)
+    args = parser.parse_args(argv)
+
+    print(f"{'сценарий':<32} | {'время, с':>8} | {'импорты, с':>10} | {'pandas':>6} | {'sklearn':>7}")
+    for name, extra in SCENARIOS:
+        with tempfile.TemporaryDirectory() as workdir:
+            data = shutil.copy(args.data, workdir)
+            # Прогрев: наполняет кэш модели и файловый кэш ОС
+            run_once(workdir, data, extra)
+            runs = [run_once(workdir, data, extra) for _ in range(args.runs)]
+        wall = statistics.median(run[0] for run in runs)
+        import_time = statistics.median(run[1] for run in runs)
+        modules = runs[-1][2]
+        print(f"{name:<32} | {wall:>8.3f} | {import_time:>10.3f} | "
+              f"{'да' if 'pandas' in modules else 'нет':>6} | {'да' if 'sklearn' in modules else 'нет':>7}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,48 @@
+"""Генератор синтетических данных в формате student_scores.csv.
+
+Часы — равномерно от 0 до 10 с одним знаком после запятой, оценки — целые
+0-100 около линии 9.8 * часы + 2 с нормальным шумом. Файл пишется блоками,
+поэтому 1e8 строк генерируются с постоянным расходом памяти.
+
+    python benchmarks/generate_data.py 1e6 scores_1e6.csv
+"""
+
+import argparse
+
+import numpy as np
+
+BLOCK_ROWS = 1_000_000
+
+# Готовые строки для всех значений: часы с шагом 0.1 и оценки 0-100
+_HOURS_TEXT = np.array([f"{tenths // 10}.{tenths % 10}," for tenths in range(101)], dtype=object)
+_SCORES_TEXT = np.array([str(score) for score in range(101)], dtype=object)
+
+
+def generate_csv(path, n_rows, seed=0, noise=5.0):
+    """Пишет CSV Hours,Scores из n_rows строк."""
+    rng = np.random.default_rng(seed)
+    with open(path, 'w', encoding='utf-8', newline='') as f:
+        f.write('Hours,Scores\n')
+        left = n_rows
+        while left > 0:
+            size = min(BLOCK_ROWS, left)
+            tenths = rng.integers(0, 101, size)
+            scores = np.clip(np.rint(0.98 * tenths + 2 + rng.normal(0, noise, size)), 0, 100).astype(np.int64)
+            lines = _HOURS_TEXT[tenths] + _SCORES_TEXT[scores]
+            f.write('\n'.join(lines))
+            f.write('\n')
+            left -= size
+    return path
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Синтетические данные Hours/Scores")
+    parser.add_argument('rows', type=float, help="число строк, например 1e6")
+    parser.add_argument('output', help="путь к CSV")
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args(argv)
+    generate_csv(args.output, int(args.rows), args.seed)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,120 @@
+"""Нагрузочный тест сервиса предсказаний serve.py: задержки p50/p99.
+
+Несколько соединений keep-alive параллельно шлют запросы /predict
+(одиночные GET или пакетные POST) и замеряют время каждого ответа.
+
+    python serve.py --data student_scores.csv &
+    python benchmarks/load_test.py --requests 20000 --concurrency 16
+    python benchmarks/load_test.py --batch 100 --start
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import subprocess
+import sys
+import time
+
+import numpy as np
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+SERVE_PATH = os.path.join(os.path.dirname(BENCH_DIR), 'serve.py')
+
+
+def build_request(host, batch, rng):
+    if batch == 0:
+        target = f"/predict?hours={rng.uniform(0, 10):.1f}"
+        return f"GET {target} HTTP/1.1\r\nHost: {host}\r\n\r\n".encode('ascii')
+    body = json.dumps({'hours': [round(rng.uniform(0, 10), 1) for _ in range(batch)]}).encode('ascii')
+    head = (f"POST /predict HTTP/1.1\r\nHost: {host}\r\nContent-Type: application/json\r\n"
+            f"Content-Length: {len(body)}\r\n\r\n")
+    return head.encode('ascii') + body
+
+
+async def read_response(reader):
+    head = await reader.readuntil(b'\r\n\r\n')
+    status = int(head.split(b' ', 2)[1])
+    length = 0
+    for line in head.split(b'\r\n'):
+        if line.lower().startswith(b'content-length:'):
+            length = int(line.split(b':', 1)[1])
+    await reader.readexactly(length)
+    return status
+
+
+async def client(host, port, count, batch, seed, latencies, errors):
+    rng = random.Random(seed)
+    reader, writer = await asyncio.open_connection(host, port)
+    try:
+        for _ in range(count):
+            request = build_request(host, batch, rng)
+            start = time.perf_counter()
+            writer.write(request)
+            await writer.drain()
+            status = await read_response(reader)
+            latencies.append(time.perf_counter() - start)
+            if status != 200:
+                errors.append(status)
+    finally:
+        writer.close()
+
+
+async def run(host, port, requests, concurrency, batch):
+    latencies, errors = [], []
+    per_client = [requests // concurrency + (i < requests % concurrency) for i in range(concurrency)]
+    start = time.perf_counter()
+    await asyncio.gather(*(client(host, port, count, batch, i, latencies, errors)
+                           for i, count in enumerate(per_client) if count))
+    return latencies, errors, time.perf_counter() - start
+
+
+async def wait_for_port(host, port, timeout=10.0):
+    deadline = time.monotonic() + timeout
+    while True:
+        try:
+            _, writer = await asyncio.open_connection(host, port)
+            writer.close()
+            return
+        except OSError:
+            if time.monotonic() > deadline:
+                raise
+            await asyncio.sleep(0.05)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Нагрузочный тест serve.py")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--requests', type=int, default=10_000, help="всего запросов (по умолчанию %(default)s)")
+    parser.add_argument('--concurrency', type=int, default=8, help="параллельных соединений (по умолчанию %(default)s)")
+    parser.add_argument('--batch', type=int, default=0,
+                        help="часов в одном POST запросе; 0 — одиночные GET (по умолчанию %(default)s)")
+    parser.add_argument('--start', action='store_true',
+                        help="запустить serve.py с фиксированной моделью на время теста")
+    args = parser.parse_args(argv)
+
+    server = None
+    if args.start:
+        server = subprocess.Popen([sys.executable, SERVE_PATH, '--slope', '9.7758', '--intercept', '2.4837',
+                                   '--host', args.host, '--port', str(args.port)], stderr=subprocess.DEVNULL)
+    try:
+        asyncio.run(wait_for_port(args.host, args.port))
+        latencies, errors, elapsed = asyncio.run(
+            run(args.host, args.port, args.requests, args.concurrency, args.batch))
+    finally:
+        if server:
+            server.terminate()
+            server.wait()
+
+    ms = np.array(latencies) * 1000
+    kind = f"POST по {args.batch} значений" if args.batch else "GET по одному значению"
+    print(f"Запросов: {len(ms)} ({kind}), соединений: {args.concurrency}, ошибок: {len(errors)}")
+    print(f"Пропускная способность: {len(ms) / elapsed:,.0f} запросов/с")
+    print(f"Задержка, мс: p50 {np.percentile(ms, 50):.3f} | p90 {np.percentile(ms, 90):.3f} | "
+          f"p99 {np.percentile(ms, 99):.3f} | max {ms.max():.3f}")
+
+
+if __name__ == '__main__':
+    main()
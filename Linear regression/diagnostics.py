@@ -0,0 +1,91 @@
+"""Диагностика модели для отчета: остатки, стандартные ошибки, интервалы.
+
+Один векторизованный проход по обучающим строкам (RegressionStats; тестовые
+вычитаются, как в fit_arrays) дает σ остатков, стандартные ошибки наклона и
+пересечения — по тем же строкам, по которым обучена прямая. Формулы верны
+только для МНК: для ridge, huber и ransac отчет интервалы не строит. По ним на фиксированной сетке
+часов — той же, что у поля калькулятора (0–20 с шагом 0.1), — считаются
+доверительный интервал среднего и интервал предсказания:
+
+    ŷ ± t · σ · √(1/n + (x - x̄)² / Σ(x-x̄)²)        среднее
+    ŷ ± t · σ · √(1 + 1/n + (x - x̄)² / Σ(x-x̄)²)    новое наблюдение
+
+Границы попадают в отчет как Float32Array, и калькулятор показывает
+интервал поиском по сетке, ничего не пересчитывая в браузере.
+"""
+
+import math
+from dataclasses import dataclass
+from statistics import NormalDist
+
+import numpy as np
+
+from regression_stats import RegressionStats
+
+# Сетка часов калькулятора: <input min="0" max="20" step="0.1">
+GRID_START = 0.0
+GRID_STOP = 20.0
+GRID_STEP = 0.1
+CONFIDENCE = 0.95
+
+
+@dataclass
+class Diagnostics:
+    """σ остатков, стандартные ошибки и границы интервалов на сетке часов."""
+
+    confidence: float
+    residual_std: float
+    slope_se: float
+    intercept_se: float
+    grid: np.ndarray
+    mean_lower: np.ndarray
+    mean_upper: np.ndarray
+    lower: np.ndarray
+    upper: np.ndarray
+
+
+def t_quantile(p, df):
+    """Квантиль распределения Стьюдента: точно для df 1 и 2, иначе ряд Корниша — Фишера.
+
+    Для df >= 5 погрешность меньше 1e-3, для df >= 10 — меньше 1e-5; scipy не нужен.
+    """
+    if df == 1:
+        return math.tan(math.pi * (p - 0.5))
+    if df == 2:
+        return (2 * p - 1) / math.sqrt(2 * p * (1 - p))
+    z = NormalDist().inv_cdf(p)
+    z2 = z * z
+    return (z
+            + z * (z2 + 1) / (4 * df)
+            + z * ((5 * z2 + 16) * z2 + 3) / (96 * df ** 2)
+            + z * (((3 * z2 + 19) * z2 + 17) * z2 - 15) / (384 * df ** 3)
+            + z * ((((79 * z2 + 776) * z2 + 1482) * z2 - 1920) * z2 - 945) / (92160 * df ** 4))
+
+
+def compute_diagnostics(hours, scores, result, test_mask=None, confidence=CONFIDENCE):
+    """Считает диагностику МНК-модели result по обучающим строкам (все, кроме test_mask);
+    None, если строк меньше трех или часы не различаются.
+    """
+    stats = RegressionStats()
+    stats.update(hours, scores)
+    if test_mask is not None:
+        test = RegressionStats()
+        test.update(hours[test_mask], scores[test_mask])
+        stats.subtract(test)
+    if stats.n < 3 or stats.cxx <= 0:
+        return None
+    _, mse = stats.score(result.slope, result.intercept)
+    df = stats.n - 2
+    residual_std = math.sqrt(mse * stats.n / df)
+    slope_se = residual_std / math.sqrt(stats.cxx)
+    intercept_se = residual_std * math.sqrt(1 / stats.n + stats.mean_x ** 2 / stats.cxx)
+
+    t = t_quantile(0.5 + confidence / 2, df)
+    grid = np.round(np.arange(GRID_START, GRID_STOP + GRID_STEP / 2, GRID_STEP), 10)
+    predicted = result.slope * grid + result.intercept
+    leverage = 1 / stats.n + (grid - stats.mean_x) ** 2 / stats.cxx
+    mean_margin = t * residual_std * np.sqrt(leverage)
+    margin = t * residual_std * np.sqrt(1 + leverage)
+    return Diagnostics(confidence, residual_std, slope_se, intercept_se, grid,
+                       predicted - mean_margin, predicted + mean_margin,
+                       predicted - margin, predicted + margin)
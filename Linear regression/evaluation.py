@@ -0,0 +1,176 @@
+"""Оценка устойчивости метрик: k-fold кросс-валидация и бутстрэп.
+
+Задачи (фолды и бутстрэп-выборки) выполняются в пуле процессов. Колонки
+Hours/Scores и перестановка для фолдов лежат в общей памяти
+(multiprocessing.shared_memory): процессы подключаются к ней по имени,
+а в задачах передаются только номера, без pickle DataFrame.
+"""
+
+import os
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from regression_stats import RANDOM_STATE, RegressionStats
+
+METRICS = ('slope', 'intercept', 'r2', 'mse')
+
+# Метрики в консольном выводе: (имя, подпись, формат)
+_LABELS = (
+    ('r2', 'R² Score', '.4f'),
+    ('mse', 'MSE', '.2f'),
+    ('slope', 'Коэффициент (наклон)', '.4f'),
+    ('intercept', 'Пересечение', '.4f'),
+)
+
+# Данные, к которым подключен процесс пула: (SharedMemory, hours, scores, permutation)
+_shared = None
+
+
+@dataclass
+class MetricSummary:
+    """Среднее, стандартное отклонение и доверительный интервал метрики."""
+
+    mean: float
+    std: float
+    low: float
+    high: float
+
+
+@dataclass
+class EvaluationResult:
+    """Сводка по фолдам (cv) и бутстрэп-выборкам (boot): {метрика: MetricSummary}."""
+
+    folds: int
+    bootstrap: int
+    confidence: float
+    cv: dict
+    boot: dict
+
+
+def _views(buffer, n_samples):
+    # Раскладка общей памяти: hours (float64), scores (float64), permutation (int64)
+    hours = np.ndarray((n_samples,), dtype=np.float64, buffer=buffer)
+    scores = np.ndarray((n_samples,), dtype=np.float64, buffer=buffer, offset=8 * n_samples)
+    permutation = np.ndarray((n_samples,), dtype=np.int64, buffer=buffer, offset=16 * n_samples)
+    return hours, scores, permutation
+
+
+def _attach(name, n_samples):
+    """Инициализатор процесса пула: подключается к общей памяти по имени."""
+    global _shared
+    shm = shared_memory.SharedMemory(name=name)
+    _shared = (shm, *_views(shm.buf, n_samples))
+
+
+def _fit_and_score(train, test):
+    slope, intercept = train.fit()
+    r2, mse = test.score(slope, intercept)
+    return slope, intercept, r2, mse
+
+
+def _run_fold(fold, folds):
+    # Суммы аддитивны: train = все данные минус тестовый фолд
+    _, hours, scores, permutation = _shared
+    bounds = np.linspace(0, len(hours), folds + 1).astype(np.int64)
+    rows = permutation[bounds[fold]:bounds[fold + 1]]
+    test = RegressionStats()
+    test.update(hours[rows], scores[rows])
+    train = RegressionStats()
+    train.update(hours, scores)
+    train.subtract(test)
+    return _fit_and_score(train, test)
+
+
+def _run_bootstrap(sample, random_state):
+    # Обучение на выборке с возвращением, метрики — на строках вне выборки (out-of-bag)
+    _, hours, scores, _ = _shared
+    n_samples = len(hours)
+    rng = np.random.default_rng([random_state, sample])
+    weights = np.bincount(rng.integers(0, n_samples, n_samples), minlength=n_samples)
+    train = RegressionStats()
+    train.update_weighted(hours, scores, weights.astype(np.float64))
+    out_of_bag = weights == 0
+    test = RegressionStats()
+    test.update(hours[out_of_bag], scores[out_of_bag])
+    return _fit_and_score(train, test)
+
+
+def _run_task(task):
+    kind, index, param = task
+    try:
+        if kind == 'fold':
+            return kind, _run_fold(index, param)
+        return kind, _run_bootstrap(index, param)
+    except ValueError:
+        # Вырожденная выборка (например, пустой out-of-bag) пропускается
+        return kind, None
+
+
+def _summarize(rows, confidence):
+    values = np.array([row for row in rows if row is not None], dtype=np.float64)
+    if len(values) == 0:
+        nan = float('nan')
+        return {name: MetricSummary(nan, nan, nan, nan) for name in METRICS}
+    alpha = (1 - confidence) / 2 * 100
+    low = np.percentile(values, alpha, axis=0)
+    high = np.percentile(values, 100 - alpha, axis=0)
+    std = values.std(axis=0, ddof=1) if len(values) > 1 else np.zeros(len(METRICS))
+    return {name: MetricSummary(float(values[:, i].mean()), float(std[i]), float(low[i]), float(high[i]))
+            for i, name in enumerate(METRICS)}
+
+
+def evaluate(hours, scores, folds=5, bootstrap=200, workers=None,
+             random_state=RANDOM_STATE, confidence=0.95):
+    """Запускает k-fold кросс-валидацию и бутстрэп в пуле из workers процессов."""
+    global _shared
+    hours = np.asarray(hours, dtype=np.float64)
+    scores = np.asarray(scores, dtype=np.float64)
+    n_samples = len(hours)
+    if folds < 2 or folds > n_samples:
+        raise ValueError(f"Число фолдов должно быть от 2 до {n_samples}")
+    workers = workers or os.cpu_count() or 1
+
+    shm = shared_memory.SharedMemory(create=True, size=24 * n_samples)
+    try:
+        shared_hours, shared_scores, permutation = _views(shm.buf, n_samples)
+        shared_hours[:] = hours
+        shared_scores[:] = scores
+        permutation[:] = np.random.RandomState(random_state).permutation(n_samples)
+        _shared = (None, shared_hours, shared_scores, permutation)
+        del shared_hours, shared_scores, permutation
+
+        tasks = [('fold', i, folds) for i in range(folds)]
+        tasks += [('boot', i, random_state) for i in range(bootstrap)]
+        if workers == 1:
+            outcomes = list(map(_run_task, tasks))
+        else:
+            with ProcessPoolExecutor(workers, initializer=_attach, initargs=(shm.name, n_samples)) as pool:
+                outcomes = list(pool.map(_run_task, tasks, chunksize=max(1, len(tasks) // (4 * workers))))
+    finally:
+        # Представления numpy должны быть освобождены до shm.close()
+        _shared = None
+        shm.close()
+        shm.unlink()
+
+    cv = _summarize([row for kind, row in outcomes if kind == 'fold'], confidence)
+    boot = _summarize([row for kind, row in outcomes if kind == 'boot'], confidence)
+    return EvaluationResult(folds, bootstrap, confidence, cv, boot)
+
+
+def print_evaluation(evaluation):
+    level = int(round(evaluation.confidence * 100))
+    print("=" * 50)
+    print("ОЦЕНКА УСТОЙЧИВОСТИ МЕТРИК")
+    print("=" * 50)
+    print(f"Кросс-валидация ({evaluation.folds} фолдов), среднее ± стандартное отклонение:")
+    for name, label, fmt in _LABELS:
+        summary = evaluation.cv[name]
+        print(f"  {label}: {summary.mean:{fmt}} ± {summary.std:{fmt}}")
+    print(f"Бутстрэп ({evaluation.bootstrap} выборок), среднее и {level}% ДИ:")
+    for name, label, fmt in _LABELS:
+        summary = evaluation.boot[name]
+        print(f"  {label}: {summary.mean:{fmt}} [{summary.low:{fmt}}; {summary.high:{fmt}}]")
+    print("=" * 50)
@@ -0,0 +1,208 @@
+"""Регрессия по когортам: отдельная модель для каждой группы строк.
+
+Для каждой группы (класс, школа) накапливаются n, средние и центрированные
+суммы Σ(x-x̄)(x-x̄)ᵀ, Σ(x-x̄)(y-ȳ), Σ(y-ȳ)² — сразу для всех групп через
+np.bincount по кодам групп. Моменты блока считаются от средних групп в этом
+блоке и объединяются с накопленными формулами Чана, как в RegressionStats:
+большие суммы Σx² не вычитаются друг из друга, и сдвинутые данные (часы
+около 1000) не теряют точности. Затем коэффициенты всех групп находятся одним пакетным
+решением систем (np.linalg.pinv по стеку матриц), без цикла по группам
+и без вызова sklearn на каждую группу. CSV читается блоками.
+
+Строки делятся на train/test хэшем номера строки (stable_test_mask), как в
+инкрементальном режиме: разбиение не требует перестановки всего файла.
+
+    python grouped.py cohorts.csv --group-by School --features Hours -o cohort_models.csv
+"""
+
+import argparse
+
+import numpy as np
+
+from regression_stats import DEFAULT_CHUNK_SIZE, RANDOM_STATE, TEST_SIZE, stable_test_mask
+
+
+class GroupedStats:
+    """Центрированные моменты для многих групп и нескольких признаков."""
+
+    def __init__(self, n_features):
+        self.n_features = n_features
+        self.n = np.zeros(0, dtype=np.int64)
+        self.mean_x = np.zeros((0, n_features))
+        self.mean_y = np.zeros(0)
+        self.cxx = np.zeros((0, n_features, n_features))
+        self.cxy = np.zeros((0, n_features))
+        self.cyy = np.zeros(0)
+
+    @property
+    def n_groups(self):
+        return len(self.n)
+
+    def _grow(self, n_groups):
+        extra = n_groups - self.n_groups
+        if extra <= 0:
+            return
+        for name in ('n', 'mean_x', 'mean_y', 'cxx', 'cxy', 'cyy'):
+            values = getattr(self, name)
+            padding = np.zeros((extra,) + values.shape[1:], dtype=values.dtype)
+            setattr(self, name, np.concatenate([values, padding]))
+
+    def update(self, codes, X, y, n_groups):
+        """Добавляет блок: codes — номера групп, X — (строк, признаков), y — цель."""
+        self._grow(n_groups)
+        p = self.n_features
+
+        def group_sum(weights):
+            return np.bincount(codes, weights=weights, minlength=n_groups)
+
+        # Моменты блока: отклонения от средних группы в этом блоке
+        n = np.bincount(codes, minlength=n_groups)
+        count = np.maximum(n, 1).astype(np.float64)
+        mean_x = np.column_stack([group_sum(X[:, i]) for i in range(p)]) / count[:, None]
+        mean_y = group_sum(y) / count
+        dx = X - mean_x[codes]
+        dy = y - mean_y[codes]
+        cxx = np.zeros((n_groups, p, p))
+        cxy = np.zeros((n_groups, p))
+        cyy = group_sum(dy * dy)
+        for i in range(p):
+            cxy[:, i] = group_sum(dx[:, i] * dy)
+            for j in range(i, p):
+                cxx[:, i, j] = cxx[:, j, i] = group_sum(dx[:, i] * dx[:, j])
+
+        # Объединение с накопленными моментами (формулы Чана для всех групп сразу)
+        total = self.n + n
+        with np.errstate(invalid='ignore', divide='ignore'):
+            weight = np.where(total > 0, n / total, 0.0)
+        factor = self.n * weight
+        delta_x = mean_x - self.mean_x
+        delta_y = mean_y - self.mean_y
+        self.mean_x += delta_x * weight[:, None]
+        self.mean_y += delta_y * weight
+        self.cxx += cxx + delta_x[:, :, None] * delta_x[:, None, :] * factor[:, None, None]
+        self.cxy += cxy + delta_x * (delta_y * factor)[:, None]
+        self.cyy += cyy + delta_y * delta_y * factor
+        self.n = total
+
+    def _centered(self):
+        # Средние и центрированные суммы всех групп; у групп без строк средние — NaN
+        empty = self.n == 0
+        mean_x = np.where(empty[:, None], np.nan, self.mean_x)
+        mean_y = np.where(empty, np.nan, self.mean_y)
+        return mean_x, mean_y, self.cxx.copy(), self.cxy.copy(), self.cyy.copy()
+
+    def fit(self):
+        """Возвращает (coef, intercept) всех групп: массивы (групп, признаков) и (групп,).
+
+        Вырожденные системы (постоянный признак, мало строк) решаются
+        псевдообратной матрицей — минимальное по норме решение, как у lstsq.
+        """
+        mean_x, mean_y, cxx, cxy, _ = self._centered()
+        empty = self.n == 0
+        cxx[empty] = 0.0
+        cxy[empty] = 0.0
+        coef = np.einsum('gij,gj->gi', np.linalg.pinv(cxx, hermitian=True), cxy)
+        intercept = mean_y - np.einsum('gi,gi->g', coef, mean_x)
+        coef[empty] = np.nan
+        return coef, intercept
+
+    def score(self, coef, intercept):
+        """Возвращает (r2, mse) всех групп на накопленных наблюдениях."""
+        mean_x, mean_y, cxx, cxy, cyy = self._centered()
+        # SSE через центрированные суммы, как в RegressionStats.score
+        bias = mean_y - np.einsum('gi,gi->g', coef, mean_x) - intercept
+        sse = (cyy - 2 * np.einsum('gi,gi->g', coef, cxy)
+               + np.einsum('gi,gij,gj->g', coef, cxx, coef) + self.n * bias * bias)
+        sse = np.maximum(sse, 0.0)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            r2 = np.where(cyy > 0, 1 - sse / cyy, np.where(sse == 0, 1.0, 0.0))
+            mse = sse / self.n
+        r2[self.n == 0] = np.nan
+        return r2, mse
+
+
+def fit_grouped(path, group_by, features, target='Scores', chunk_size=DEFAULT_CHUNK_SIZE,
+                test_size=TEST_SIZE, random_state=RANDOM_STATE):
+    """Обучает модель для каждой группы; возвращает DataFrame с коэффициентами и метриками."""
+    import pandas as pd
+
+    columns = [group_by, *features, target]
+    train = GroupedStats(len(features))
+    test = GroupedStats(len(features))
+    # Номера групп сквозные для всех блоков: ключ -> номер
+    group_codes = {}
+    row_index = 0
+    reader = pd.read_csv(path, usecols=columns, dtype={name: 'float64' for name in (*features, target)},
+                         chunksize=chunk_size)
+    for chunk in reader:
+        in_test = stable_test_mask(row_index, len(chunk), test_size, random_state)
+        row_index += len(chunk)
+        # Строки без ключа группы (-1 у factorize) пропускаются
+        local_codes, keys = pd.factorize(chunk[group_by])
+        keep = local_codes >= 0
+        mapping = np.array([group_codes.setdefault(key, len(group_codes)) for key in keys], dtype=np.int64)
+        codes = mapping[local_codes[keep]]
+        X = chunk[list(features)].to_numpy()[keep]
+        y = chunk[target].to_numpy()[keep]
+        in_test = in_test[keep]
+        train.update(codes[~in_test], X[~in_test], y[~in_test], len(group_codes))
+        test.update(codes[in_test], X[in_test], y[in_test], len(group_codes))
+
+    coef, intercept = train.fit()
+    r2, mse = test.score(coef, intercept)
+    results = pd.DataFrame({group_by: list(group_codes), 'n_train': train.n, 'n_test': test.n,
+                            'intercept': intercept})
+    for i, name in enumerate(features):
+        results[f'coef_{name}'] = coef[:, i]
+    results['r2'] = r2
+    results['mse'] = mse
+    return results
+
+
+def write_results(results, output, decimals=6):
+    """Пишет таблицу результатов: .parquet — в Parquet, иначе в CSV."""
+    if output.endswith('.parquet'):
+        results.to_parquet(output, index=False)
+    else:
+        results.round(decimals).to_csv(output, index=False)
+
+
+def print_summary(results, group_by):
+    r2 = results['r2'].dropna()
+    print("=" * 50)
+    print("РЕГРЕССИЯ ПО ГРУППАМ")
+    print("=" * 50)
+    print(f"Групп ({group_by}): {len(results)}")
+    print(f"Строк: {int(results['n_train'].sum() + results['n_test'].sum())}")
+    if len(r2):
+        print(f"R² Score: медиана {r2.median():.4f}, от {r2.min():.4f} до {r2.max():.4f}")
+    print(f"Групп без тестовых строк: {int((results['n_test'] == 0).sum())}")
+    print("=" * 50)
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Линейная регрессия по группам (когортам)")
+    parser.add_argument('data', help="CSV с колонкой группы, признаками и целевой колонкой")
+    parser.add_argument('--group-by', required=True, help="колонка группы, например School")
+    parser.add_argument('--features', nargs='+', default=['Hours'],
+                        help="колонки признаков (по умолчанию %(default)s)")
+    parser.add_argument('--target', default='Scores', help="целевая колонка (по умолчанию %(default)s)")
+    parser.add_argument('-o', '--output', default='grouped_models.csv',
+                        help="таблица результатов: .csv или .parquet (по умолчанию %(default)s)")
+    parser.add_argument('--chunk-size', type=int, default=DEFAULT_CHUNK_SIZE,
+                        help="число строк в блоке (по умолчанию %(default)s)")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    if args.chunk_size <= 0:
+        raise SystemExit("--chunk-size должен быть положительным")
+    results = fit_grouped(args.data, args.group_by, args.features, args.target, args.chunk_size)
+    write_results(results, args.output)
+    print_summary(results, args.group_by)
+    print(f"\n✅ Таблица моделей по группам: {args.output}")
+
+
+if __name__ == '__main__':
+    main()
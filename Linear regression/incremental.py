@@ -0,0 +1,185 @@
+"""Инкрементальное дообучение при дописывании строк в конец CSV.
+
+После каждого запуска сохраняется состояние: смещение в байтах до конца
+прочитанных данных, время изменения файла и накопленные моменты
+train/test. Следующий запуск читает только новый хвост файла и обновляет
+моменты, а если файл был переписан (а не дописан), пересчитывает все с
+начала. Файл, который изменился, но не вырос, всегда считается
+переписанным: правку в середине с той же длиной строки не видно по окнам
+в начале и в конце прочитанной части.
+
+Строки делятся на train/test хэшем номера строки (stable_test_mask), а не
+перестановкой train_test_split: иначе каждая новая строка меняла бы
+состав выборок и дообучение было бы невозможно.
+"""
+
+import csv
+import hashlib
+import io
+import json
+import os
+
+import numpy as np
+
+from model_cache import write_json_atomic
+from readers import SMALL_FILE_BYTES, parse_csv_rows
+from regression_stats import DEFAULT_CHUNK_SIZE, FitResult, RegressionStats, stable_test_mask
+
+STATE_VERSION = 3
+# Размер окон в начале файла и перед смещением, по которым проверяется,
+# что прочитанная часть файла не изменилась
+CHECK_WINDOW = 4096
+
+
+def state_path_for(path, cache_dir):
+    """Путь к файлу состояния для CSV path внутри каталога кэша."""
+    name = hashlib.blake2b(os.path.abspath(path).encode('utf-8'), digest_size=8).hexdigest()
+    # Отдельный подкаталог: LRU-вытеснение ModelCache его не затрагивает
+    return os.path.join(cache_dir, 'incremental', name + '.json')
+
+
+class _ByteRange(io.RawIOBase):
+    """Файл, ограниченный байтами [start, end): pandas не читает дальше end."""
+
+    def __init__(self, f, start, end):
+        self._f = f
+        self._f.seek(start)
+        self._left = end - start
+
+    def readable(self):
+        return True
+
+    def readinto(self, buffer):
+        size = min(len(buffer), self._left)
+        if size <= 0:
+            return 0
+        read = self._f.readinto(memoryview(buffer)[:size])
+        self._left -= read
+        return read
+
+
+def _window_digest(f, start, end):
+    f.seek(start)
+    return hashlib.blake2b(f.read(end - start), digest_size=16).hexdigest()
+
+
+def _new_state(path, test_size, random_state):
+    with open(path, 'rb') as f:
+        header = f.readline()
+    columns = header.decode('utf-8-sig').strip().split(',')
+    return {
+        'version': STATE_VERSION,
+        'columns': columns,
+        'offset': len(header),
+        'last_line_terminated': header.endswith(b'\n'),
+        'test_size': test_size,
+        'random_state': random_state,
+        'train': RegressionStats().to_dict(),
+        'test': RegressionStats().to_dict(),
+    }
+
+
+def _is_appended(f, stat, state, test_size, random_state):
+    """Проверяет, что файл с момента прошлого запуска только дописывался."""
+    offset = state['offset']
+    size = stat.st_size
+    if state.get('version') != STATE_VERSION or size < offset:
+        return False
+    if size == offset and stat.st_mtime_ns != state['mtime_ns']:
+        # Файл изменился, но не вырос: дописанных строк нет, значит его переписали
+        return False
+    if (state['test_size'], state['random_state']) != (test_size, random_state):
+        return False
+    if _window_digest(f, 0, min(CHECK_WINDOW, offset)) != state['head_digest']:
+        return False
+    if _window_digest(f, max(0, offset - CHECK_WINDOW), offset) != state['tail_digest']:
+        return False
+    if not state['last_line_terminated'] and size > offset:
+        # Последняя строка прошлого запуска была без перевода строки:
+        # хвост должен начинаться с него, иначе строку дописали
+        f.seek(offset)
+        return f.read(1) in (b'\n', b'\r')
+    return True
+
+
+def _tail_blocks(f, start, end, columns, chunk_size):
+    """Блоки (часы, оценки) в float64 из байтов [start, end) файла.
+
+    Небольшой хвост (обычное дописывание) разбирается модулем csv: импорт
+    pandas дороже самого дообучения. pandas нужен только для большого или
+    нестандартного хвоста.
+    """
+    if end - start <= SMALL_FILE_BYTES:
+        f.seek(start)
+        text = f.read(end - start).decode('utf-8')
+        try:
+            hours, scores = parse_csv_rows(csv.reader(io.StringIO(text, newline='')), columns)
+        except ValueError:
+            pass  # пропуски, кавычки и т.п. разбирает pandas
+        else:
+            yield hours.astype(np.float64, copy=False), scores.astype(np.float64, copy=False)
+            return
+    import pandas as pd
+
+    tail = io.BufferedReader(_ByteRange(f, start, end))
+    reader = pd.read_csv(tail, header=None, names=columns, usecols=['Hours', 'Scores'], dtype='float64',
+                         chunksize=chunk_size)
+    for chunk in reader:
+        yield chunk['Hours'].to_numpy(), chunk['Scores'].to_numpy()
+
+
+def _load_state(state_path):
+    try:
+        with open(state_path, encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def fit_incremental(path, state_path, chunk_size=DEFAULT_CHUNK_SIZE, test_size=0.2, random_state=42):
+    """Обновляет модель по строкам, дописанным после прошлого запуска.
+
+    Возвращает (FitResult, mode, rows_read), где mode — 'full' (состояния не
+    было или файл переписан), 'append' или 'unchanged'.
+    """
+    state = _load_state(state_path)
+    with open(path, 'rb') as f:
+        # Читаем только до размера на момент начала: строки, дописанные во
+        # время работы, попадут в следующий запуск
+        stat = os.fstat(f.fileno())
+        size = stat.st_size
+        if state is not None and _is_appended(f, stat, state, test_size, random_state):
+            mode = 'append' if size > state['offset'] else 'unchanged'
+        else:
+            state = _new_state(path, test_size, random_state)
+            mode = 'full'
+
+        train = RegressionStats.from_dict(state['train'])
+        test = RegressionStats.from_dict(state['test'])
+        row_index = train.n + test.n
+        rows_read = 0
+
+        if size > state['offset']:
+            for x, y in _tail_blocks(f, state['offset'], size, state['columns'], chunk_size):
+                in_test = stable_test_mask(row_index, len(x), test_size, random_state)
+                row_index += len(x)
+                rows_read += len(x)
+                train.update(x[~in_test], y[~in_test])
+                test.update(x[in_test], y[in_test])
+
+            f.seek(size - 1)
+            state['last_line_terminated'] = f.read(1) == b'\n'
+            state['offset'] = size
+
+        state['head_digest'] = _window_digest(f, 0, min(CHECK_WINDOW, size))
+        state['tail_digest'] = _window_digest(f, max(0, size - CHECK_WINDOW), size)
+        state['mtime_ns'] = stat.st_mtime_ns
+
+    state['train'] = train.to_dict()
+    state['test'] = test.to_dict()
+    os.makedirs(os.path.dirname(state_path) or '.', exist_ok=True)
+    write_json_atomic(state_path, state)
+
+    slope, intercept = train.fit()
+    r2, mse = test.score(slope, intercept)
+    return FitResult(slope, intercept, r2, mse, train.n, test.n), mode, rows_read
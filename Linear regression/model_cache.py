@@ -0,0 +1,133 @@
+"""Кэш обученной модели и метрик на диске.
+
+Ключ — хэш содержимого CSV вместе с параметрами разбиения, поэтому при
+неизменных данных повторный запуск не делает train_test_split и fit.
+Каждая запись — небольшой JSON файл; при превышении max_entries удаляются
+записи, которые дольше всего не использовались.
+"""
+
+import hashlib
+import json
+import math
+import os
+import tempfile
+from dataclasses import asdict
+
+from regression_stats import FitResult
+
+DEFAULT_CACHE_DIR = '.model_cache'
+DEFAULT_MAX_ENTRIES = 64
+CACHE_VERSION = 1
+
+
+def file_digest(path, block_size=1 << 20):
+    """Хэш содержимого файла, читаемого блоками; для каталога — всех его файлов с именами."""
+    digest = hashlib.blake2b(digest_size=20)
+    if os.path.isdir(path):
+        paths = [os.path.join(path, name) for name in sorted(os.listdir(path))]
+    else:
+        paths = [path]
+    for file_path in paths:
+        if file_path != path:
+            digest.update(os.path.basename(file_path).encode('utf-8') + b'\0')
+        with open(file_path, 'rb') as f:
+            while True:
+                block = f.read(block_size)
+                if not block:
+                    break
+                digest.update(block)
+    return digest.hexdigest()
+
+
+def write_json_atomic(path, obj):
+    """Пишет JSON через временный файл и os.replace, чтобы не оставить половину файла.
+
+    NaN и бесконечность — ValueError: в JSON для них нет записи.
+    """
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path) or '.', suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            json.dump(obj, f, allow_nan=False)
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+
+
+def is_finite_result(result):
+    """True, если наклон, пересечение, R² и MSE — конечные числа."""
+    return all(math.isfinite(value) for value in (result.slope, result.intercept, result.r2, result.mse))
+
+
+class ModelCache:
+    """Каталог с JSON записями FitResult и LRU-вытеснением по числу записей."""
+
+    def __init__(self, cache_dir=DEFAULT_CACHE_DIR, max_entries=DEFAULT_MAX_ENTRIES):
+        self.cache_dir = cache_dir
+        self.max_entries = max_entries
+
+    def key_for(self, path, test_size, random_state, split='random', model=None, compact=True):
+        params = f"v{CACHE_VERSION}|test_size={test_size!r}|random_state={random_state!r}"
+        if split != 'random':
+            # Ключи записей со случайным разбиением остаются прежними
+            params += f"|split={split}"
+        if model is not None:
+            # Способ обучения, отличный от МНК, и его параметры (robust.engine_label)
+            params += f"|model={model}"
+        if not compact:
+            # Модель по колонкам int64/float64 (--no-compact), а не по float32/uint8
+            params += "|compact=False"
+        params_digest = hashlib.blake2b(params.encode('utf-8'), digest_size=8).hexdigest()
+        return f"{file_digest(path)}-{params_digest}"
+
+    def _entry_path(self, key):
+        return os.path.join(self.cache_dir, key + '.json')
+
+    def get(self, key):
+        """Возвращает FitResult из кэша или None."""
+        entry_path = self._entry_path(key)
+        try:
+            with open(entry_path, encoding='utf-8') as f:
+                entry = json.load(f)
+            result = FitResult(**entry['result'])
+        except (OSError, ValueError, KeyError, TypeError):
+            return None
+        if not is_finite_result(result):
+            # Запись старой версии с NaN: обучаем заново
+            return None
+        # Обновляем время доступа для LRU-вытеснения
+        try:
+            os.utime(entry_path)
+        except OSError:
+            pass
+        return result
+
+    def put(self, key, result, source=None):
+        """Сохраняет FitResult атомарно и вытесняет старые записи; результат с NaN не сохраняется."""
+        if not is_finite_result(result):
+            return
+        os.makedirs(self.cache_dir, exist_ok=True)
+        entry = {
+            'version': CACHE_VERSION,
+            'source': source,
+            'result': {name: value.item() if hasattr(value, 'item') else value
+                       for name, value in asdict(result).items()},
+        }
+        write_json_atomic(self._entry_path(key), entry)
+        self.evict()
+
+    def evict(self):
+        """Оставляет не более max_entries записей, удаляя самые давние по использованию."""
+        entries = []
+        for entry in os.scandir(self.cache_dir):
+            if entry.name.endswith('.json'):
+                try:
+                    entries.append((entry.stat().st_mtime, entry.path))
+                except OSError:
+                    continue
+        entries.sort(reverse=True)
+        for _, path in entries[self.max_entries:]:
+            try:
+                os.unlink(path)
+            except OSError:
+                pass
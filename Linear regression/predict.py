@@ -0,0 +1,125 @@
+"""Пакетное предсказание оценок по сохраненной модели.
+
+Читает CSV с часами обучения блоками и пишет предсказания, не обучая
+модель и не создавая HTML отчет. Параметры модели задаются явно
+(--slope/--intercept) или берутся из кэша, который заполняет student_score.py.
+
+    python predict.py planned_hours.csv -o predictions.csv --data student_scores.csv
+    python predict.py planned_hours.csv --slope 9.8756 --intercept 0.1342
+"""
+
+import argparse
+import sys
+
+import numpy as np
+
+from model_cache import DEFAULT_CACHE_DIR, ModelCache
+from regression_stats import DEFAULT_CHUNK_SIZE, RANDOM_STATE, SPLITS, TEST_SIZE, StreamingMetrics
+from robust import DEFAULT_ALPHA, DEFAULT_EPSILON, DEFAULT_MAX_ITER, ROBUST_ENGINES, engine_label
+
+# Те же границы, что и в predictScore() отчета
+MIN_SCORE = 0.0
+MAX_SCORE = 100.0
+
+
+def predict_scores(hours, slope, intercept):
+    """Векторное предсказание оценки с ограничением в пределах 0-100."""
+    predicted = np.asarray(hours, dtype=np.float64) * slope + intercept
+    return np.clip(predicted, MIN_SCORE, MAX_SCORE, out=predicted)
+
+
+def predict_file(input_path, output, slope, intercept, column='Hours',
+                 chunk_size=DEFAULT_CHUNK_SIZE, decimals=2, target=None, metrics=None):
+    """Предсказывает оценки для колонки column файла input_path блоками.
+
+    output — путь или открытый текстовый файл. Возвращает число строк.
+    Если задана колонка target с известными оценками, предсказания каждого
+    блока добавляются в metrics (StreamingMetrics): R²/MSE считаются без
+    вектора предсказаний целиком.
+    """
+    import pandas as pd
+
+    rows = 0
+    columns = [column] if target is None else [column, target]
+    reader = pd.read_csv(input_path, usecols=columns, dtype={column: 'float64'}, chunksize=chunk_size)
+    for i, chunk in enumerate(reader):
+        predicted = predict_scores(chunk[column].to_numpy(), slope, intercept)
+        if metrics is not None:
+            metrics.update(chunk[target].to_numpy(), predicted)
+        chunk['PredictedScore'] = np.round(predicted, decimals)
+        chunk.to_csv(output, mode='w' if i == 0 else 'a', header=i == 0, index=False)
+        rows += len(chunk)
+    if rows == 0:
+        pd.DataFrame(columns=[*columns, 'PredictedScore']).to_csv(output, index=False)
+    return rows
+
+
+def load_model(args):
+    """Возвращает (slope, intercept) из аргументов или из кэша модели."""
+    if args.slope is not None and args.intercept is not None:
+        return args.slope, args.intercept
+    if args.slope is not None or args.intercept is not None:
+        raise SystemExit("--slope и --intercept задаются вместе")
+    if args.data is None:
+        raise SystemExit("Укажите --slope и --intercept или --data для модели из кэша")
+
+    cache = ModelCache(args.cache_dir)
+    # Ключ — как у student_score.py с теми же --split, --engine и его параметрами, --no-compact
+    model = engine_label(args.engine, alpha=args.alpha, epsilon=args.epsilon, max_iter=args.max_iter)
+    result = cache.get(cache.key_for(args.data, TEST_SIZE, RANDOM_STATE, args.split, model, not args.no_compact))
+    if result is None:
+        raise SystemExit(f"В кэше {args.cache_dir} нет модели для {args.data}: "
+                         "сначала запустите student_score.py")
+    return result.slope, result.intercept
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Пакетное предсказание оценок по часам обучения")
+    parser.add_argument('input', help="CSV с колонкой часов обучения")
+    parser.add_argument('-o', '--output', default='-',
+                        help="файл для предсказаний ('-' — стандартный вывод, по умолчанию)")
+    parser.add_argument('--column', default='Hours', help="колонка с часами (по умолчанию %(default)s)")
+    parser.add_argument('--target', help="колонка с известными оценками: вывести R² и MSE предсказаний")
+    parser.add_argument('--slope', type=float, help="наклон модели")
+    parser.add_argument('--intercept', type=float, help="пересечение модели")
+    parser.add_argument('--data', help="CSV, на котором обучена модель: параметры берутся из кэша")
+    parser.add_argument('--cache-dir', default=DEFAULT_CACHE_DIR,
+                        help="каталог кэша модели (по умолчанию %(default)s)")
+    parser.add_argument('--split', choices=SPLITS, default='random',
+                        help="разбиение, с которым обучена модель в кэше (по умолчанию %(default)s)")
+    parser.add_argument('--engine', choices=('closed-form', 'sklearn', *ROBUST_ENGINES), default='closed-form',
+                        help="способ обучения модели в кэше, как у student_score.py (по умолчанию %(default)s)")
+    parser.add_argument('--alpha', type=float, default=DEFAULT_ALPHA,
+                        help="--alpha модели ridge в кэше (по умолчанию %(default)s)")
+    parser.add_argument('--epsilon', type=float, default=DEFAULT_EPSILON,
+                        help="--epsilon модели huber в кэше (по умолчанию %(default)s)")
+    parser.add_argument('--max-iter', type=int, default=DEFAULT_MAX_ITER,
+                        help="--max-iter модели huber в кэше (по умолчанию %(default)s)")
+    parser.add_argument('--no-compact', action='store_true',
+                        help="модель в кэше обучена с --no-compact")
+    parser.add_argument('--chunk-size', type=int, default=DEFAULT_CHUNK_SIZE,
+                        help="число строк в блоке (по умолчанию %(default)s)")
+    parser.add_argument('--decimals', type=int, default=2,
+                        help="знаков после запятой в предсказании (по умолчанию %(default)s)")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    if args.chunk_size <= 0:
+        raise SystemExit("--chunk-size должен быть положительным")
+    slope, intercept = load_model(args)
+
+    output = sys.stdout if args.output == '-' else args.output
+    metrics = StreamingMetrics() if args.target else None
+    rows = predict_file(args.input, output, slope, intercept, args.column, args.chunk_size, args.decimals,
+                        args.target, metrics)
+    print(f"✅ Предсказано оценок: {rows} (y = {slope:.4f}x + {intercept:.4f})", file=sys.stderr)
+    if metrics is not None and metrics.n:
+        r2, mse = metrics.result()
+        print(f"R² Score: {r2:.4f}", file=sys.stderr)
+        print(f"MSE: {mse:.2f}", file=sys.stderr)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,82 @@
+"""Замеры этапов: время, процессорное время и пик выделенной памяти.
+
+По умолчанию выключены: stage() возвращает пустой контекст и ничего не
+стоит. После enable() каждый этап пишет строку JSON (JSON Lines) в файл
+или в stderr:
+
+    {"event": "stage", "stage": "fit", "wall_s": 0.0123, "cpu_s": 0.0121,
+     "alloc_peak_bytes": 1048576, "pid": 4242, "ts": 1760000000.0}
+
+alloc_peak_bytes — пик памяти, выделенной во время этапа (tracemalloc;
+массивы numpy тоже учитываются). Этапы не вкладываются друг в друга:
+tracemalloc включается на время одного этапа.
+"""
+
+import json
+import os
+import sys
+import time
+import tracemalloc
+from contextlib import contextmanager, nullcontext
+
+# Куда пишутся строки JSON; None — замеры выключены
+_output = None
+_started = None
+# Наибольший пик выделенной памяти среди этапов
+_alloc_peak = 0
+
+
+def enable(path='-'):
+    """Включает замеры; path — файл для дописывания строк или '-' для stderr."""
+    global _output, _started, _alloc_peak
+    _output = sys.stderr if path == '-' else open(path, 'a', encoding='utf-8')
+    _started = (time.perf_counter(), time.process_time())
+    _alloc_peak = 0
+
+
+def emit(event, **fields):
+    """Пишет одну строку JSON, если замеры включены."""
+    if _output is None:
+        return
+    record = {'event': event, **fields, 'pid': os.getpid(), 'ts': round(time.time(), 3)}
+    _output.write(json.dumps(record, ensure_ascii=False) + '\n')
+    _output.flush()
+
+
+@contextmanager
+def _measure(name, fields):
+    # tracemalloc работает только внутри этапа: импорты и код между этапами
+    # не замедляются
+    global _alloc_peak
+    tracemalloc.start()
+    wall = time.perf_counter()
+    cpu = time.process_time()
+    try:
+        yield
+    finally:
+        wall = time.perf_counter() - wall
+        cpu = time.process_time() - cpu
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        _alloc_peak = max(_alloc_peak, peak)
+        emit('stage', stage=name, wall_s=round(wall, 6), cpu_s=round(cpu, 6), alloc_peak_bytes=peak, **fields)
+
+
+def stage(name, **fields):
+    """Контекст замера этапа name; fields дописываются в строку JSON."""
+    if _output is None:
+        return nullcontext()
+    return _measure(name, fields)
+
+
+def finish(**fields):
+    """Пишет итоговую строку запуска и выключает замеры."""
+    global _output
+    if _output is None:
+        return
+    wall = time.perf_counter() - _started[0]
+    cpu = time.process_time() - _started[1]
+    emit('run', wall_s=round(wall, 6), cpu_s=round(cpu, 6), alloc_peak_bytes=_alloc_peak, **fields)
+    if _output is not sys.stderr:
+        _output.close()
+    _output = None
@@ -0,0 +1,321 @@
+"""Чтение колонок Hours и Scores из CSV и колоночных бинарных форматов.
+
+Разбор текста CSV — самая дорогая часть загрузки больших данных. Поэтому
+кроме CSV поддерживаются форматы, которые читаются без разбора:
+
+- npy — каталог с Hours.npy и Scores.npy, файлы отображаются в память
+  (np.load(mmap_mode='r')), колонки не копируются;
+- arrow — файл Arrow IPC (.arrow, .feather), отображается в память.
+  Обучение читает его по блокам записей (arrow_batches) без копирования,
+  сколько бы блоков ни было; колонки целиком (для HTML отчета) без копии
+  отдаются только для файла из одного блока, иначе блоки склеиваются;
+- parquet — файл .parquet (сжатие требует распаковки, но не разбора текста).
+
+CSV по умолчанию читается в компактные типы: оценки — uint8, если все они
+целые от 0 до 255, часы — float32, если у всех не больше одного знака после
+запятой и по модулю они не больше COMPACT_HOURS_MAX (там float32 отличается
+от десятичной записи не больше чем на 3e-5). Иначе колонка остается
+int64/float64. Так колонки занимают 5 байт на строку вместо 16; все суммы
+по-прежнему считаются в float64 (RegressionStats переводит блоки сам).
+
+Для Arrow и Parquet нужен pyarrow. Однократная конвертация CSV:
+
+    python readers.py student_scores.csv student_scores_npy --to npy
+    python readers.py big_scores.csv big_scores.parquet
+"""
+
+import argparse
+import csv
+import os
+
+import numpy as np
+
+import profiling
+
+COLUMNS = ('Hours', 'Scores')
+FORMATS = ('csv', 'npy', 'arrow', 'parquet')
+CONVERT_CHUNK_SIZE = 1_000_000
+# Блок чтения большого CSV: в float64 разбирается только он, колонки хранятся компактно
+COMPACT_CHUNK_SIZE = 1 << 18
+# Предел |часов| для float32: ниже 1024 шаг float32 не больше 2**-14, ошибка
+# значения — до 3e-5 (у 100000.1 — уже 1.6e-3)
+COMPACT_HOURS_MAX = 1024
+# Файлы до этого размера читаются модулем csv, без импорта pandas
+SMALL_FILE_BYTES = 1 << 20
+
+_EXTENSIONS = {
+    '.parquet': 'parquet',
+    '.pq': 'parquet',
+    '.arrow': 'arrow',
+    '.feather': 'arrow',
+    '.ipc': 'arrow',
+}
+
+
+def detect_format(path):
+    """Формат по пути: каталог — npy, иначе по расширению, по умолчанию csv."""
+    if os.path.isdir(path):
+        return 'npy'
+    return _EXTENSIONS.get(os.path.splitext(path)[1].lower(), 'csv')
+
+
+def _parse_column(values):
+    # Как pandas: целые числа — int64, иначе float64
+    try:
+        return np.array([int(v) for v in values], dtype=np.int64)
+    except ValueError:
+        return np.array([float(v) for v in values], dtype=np.float64)
+
+
+def compact_hours(values):
+    """float32, если все |значения| <= COMPACT_HOURS_MAX и восстанавливаются округлением до 0.1; иначе как есть."""
+    if values.dtype == np.float32 or values.dtype.kind not in 'fiu':
+        return values
+    if len(values) and not np.abs(values).max() <= COMPACT_HOURS_MAX:
+        return values
+    compact = values.astype(np.float32)
+    if np.array_equal(np.round(compact.astype(np.float64), 1), values):
+        return compact
+    return values
+
+
+def compact_scores(values):
+    """uint8, если все значения — целые от 0 до 255; иначе как есть."""
+    if values.dtype == np.uint8 or values.dtype.kind not in 'fiu' or len(values) == 0:
+        return values
+    if values.min() < 0 or values.max() > 255:
+        return values
+    if values.dtype.kind == 'f' and not np.array_equal(values, np.rint(values)):
+        return values
+    return values.astype(np.uint8)
+
+
+def parse_csv_rows(rows, header):
+    """Колонки Hours и Scores из строк csv.reader без заголовка; header — имена колонок.
+
+    ValueError — если формат нестандартный (разбирать такой файл нужно pandas).
+    """
+    hours_index = header.index('Hours')
+    scores_index = header.index('Scores')
+    hours, scores = [], []
+    for row in rows:
+        if not row:
+            continue
+        if len(row) != len(header):
+            raise ValueError(f"Ожидалось {len(header)} полей: {row}")
+        hours.append(row[hours_index])
+        scores.append(row[scores_index])
+    return _parse_column(hours), _parse_column(scores)
+
+
+def read_small_csv(path):
+    """Читает колонки Hours и Scores модулем csv. ValueError — если формат нестандартный."""
+    with open(path, newline='', encoding='utf-8-sig') as f:
+        reader = csv.reader(f)
+        return parse_csv_rows(reader, next(reader, []))
+
+
+def read_csv(path, compact=True):
+    """Читает колонки CSV; с compact — в компактные типы (compact_hours, compact_scores)."""
+    if os.path.getsize(path) <= SMALL_FILE_BYTES:
+        try:
+            hours, scores = read_small_csv(path)
+        except ValueError:
+            pass  # пропуски, кавычки и т.п. разбирает pandas
+        else:
+            return (compact_hours(hours), compact_scores(scores)) if compact else (hours, scores)
+    import pandas as pd
+
+    if not compact:
+        df = pd.read_csv(path)
+        return df['Hours'].to_numpy(), df['Scores'].to_numpy()
+    # Блоки сжимаются сразу после разбора; если блок не сжался, concatenate
+    # повышает тип всей колонки, как это сделал бы pandas
+    hours, scores = [], []
+    for chunk in pd.read_csv(path, usecols=list(COLUMNS), chunksize=COMPACT_CHUNK_SIZE):
+        hours.append(compact_hours(chunk['Hours'].to_numpy()))
+        scores.append(compact_scores(chunk['Scores'].to_numpy()))
+    if not hours:
+        return np.array([], dtype=np.float64), np.array([], dtype=np.int64)
+    # uint8 расширяется до int64/float64 точно, поэтому оценки склеиваются как есть
+    return _concatenate_hours(hours), np.concatenate(scores)
+
+
+def _concatenate_hours(parts):
+    """Склеивает блоки часов; если колонка не сжалась целиком, float32 восстанавливаются до исходных значений."""
+    if all(part.dtype == np.float32 for part in parts):
+        return np.concatenate(parts)
+    # Простое расширение float32 дало бы 6.699999809265137 вместо 6.7
+    return np.concatenate([np.round(part.astype(np.float64), 1) if part.dtype == np.float32 else part
+                           for part in parts])
+
+
+def read_npy(path):
+    return tuple(np.load(os.path.join(path, name + '.npy'), mmap_mode='r') for name in COLUMNS)
+
+
+def _import_pyarrow():
+    try:
+        import pyarrow
+    except ImportError as e:
+        raise ImportError("Для форматов Arrow и Parquet нужен pyarrow: pip install pyarrow") from e
+    return pyarrow
+
+
+def _open_arrow(path):
+    pa = _import_pyarrow()
+    return pa.ipc.open_file(pa.memory_map(path, 'r'))
+
+
+def arrow_row_count(path):
+    """Число строк файла Arrow IPC по заголовкам блоков записей, без чтения данных."""
+    reader = _open_arrow(path)
+    return sum(reader.get_batch(i).num_rows for i in range(reader.num_record_batches))
+
+
+def arrow_batches(path):
+    """(часы, оценки) каждого блока записей Arrow IPC: массивы numpy поверх отображенного файла, без копий."""
+    reader = _open_arrow(path)
+    for i in range(reader.num_record_batches):
+        batch = reader.get_batch(i)
+        yield tuple(batch.column(batch.schema.get_field_index(name)).to_numpy(zero_copy_only=True)
+                    for name in COLUMNS)
+
+
+def read_arrow(path):
+    batches = list(arrow_batches(path))
+    if len(batches) == 1:
+        return batches[0]
+    if not batches:
+        return np.array([], dtype=np.float64), np.array([], dtype=np.int64)
+    # Колонки целиком нужны отчету; обучение идет по блокам (regression_stats.arrow_blocks)
+    return tuple(np.concatenate(parts) for parts in zip(*batches))
+
+
+def read_parquet(path):
+    _import_pyarrow()
+    import pyarrow.parquet as pq
+
+    table = pq.read_table(path, columns=list(COLUMNS), memory_map=True)
+    return tuple(table.column(name).to_numpy() for name in COLUMNS)
+
+
+READERS = {
+    'csv': read_csv,
+    'npy': read_npy,
+    'arrow': read_arrow,
+    'parquet': read_parquet,
+}
+
+
+def load_columns(path, fmt=None, compact=True):
+    """Загружает колонки Hours и Scores как массивы numpy (формат — по пути).
+
+    compact относится к CSV; бинарные форматы отображаются в память в том
+    типе, в котором записаны (см. convert_csv).
+    """
+    fmt = fmt or detect_format(path)
+    with profiling.stage('read_csv' if fmt == 'csv' else 'read_' + fmt):
+        if fmt == 'csv':
+            return read_csv(path, compact)
+        return READERS[fmt](path)
+
+
+_COMPACTORS = {'Hours': compact_hours, 'Scores': compact_scores}
+
+
+def _chunk_column(chunk, name, dtype):
+    values = chunk[name].to_numpy()
+    if dtype in (np.uint8, np.float32) and _COMPACTORS[name](values).dtype != dtype:
+        raise ValueError(f"Колонка {name} после первого блока не помещается в {np.dtype(dtype).name}: "
+                         "запустите конвертацию с --no-compact")
+    if dtype == np.int64 and values.dtype.kind != 'i':
+        # Тип колонки задан первым блоком; дробное значение позже его бы исказило
+        if not np.array_equal(values, np.rint(values)):
+            raise ValueError(f"В колонке {name} после целых значений встретились дробные или пропуски")
+    return values.astype(dtype, copy=False)
+
+
+def convert_csv(csv_path, output, fmt=None, chunk_size=CONVERT_CHUNK_SIZE, compact=True):
+    """Однократно переводит CSV в формат fmt, читая его блоками. Возвращает число строк.
+
+    Типы колонок выбираются по первому блоку: с compact — uint8/float32, если
+    блок в них помещается (как при чтении CSV), иначе целые — int64,
+    остальные — float64.
+    """
+    import pandas as pd
+
+    from regression_stats import count_rows
+
+    fmt = fmt or detect_format(output)
+    if fmt == 'csv':
+        raise ValueError("Укажите формат назначения: npy, arrow или parquet")
+
+    reader = pd.read_csv(csv_path, usecols=list(COLUMNS), chunksize=chunk_size)
+    first = next(reader, None)
+    if first is None:
+        first = pd.DataFrame({name: np.array([], dtype=np.float64) for name in COLUMNS})
+    dtypes = {name: np.int64 if first[name].dtype.kind == 'i' else np.float64 for name in COLUMNS}
+    if compact and len(first):
+        dtypes = {name: _COMPACTORS[name](first[name].to_numpy().astype(dtypes[name], copy=False)).dtype.type
+                  for name in COLUMNS}
+
+    def chunks():
+        yield first
+        yield from reader
+
+    if fmt == 'npy':
+        n_samples = count_rows(csv_path)
+        os.makedirs(output, exist_ok=True)
+        columns = {name: np.lib.format.open_memmap(os.path.join(output, name + '.npy'), mode='w+',
+                                                   dtype=dtypes[name], shape=(n_samples,))
+                   for name in COLUMNS}
+        offset = 0
+        for chunk in chunks():
+            for name in COLUMNS:
+                columns[name][offset:offset + len(chunk)] = _chunk_column(chunk, name, dtypes[name])
+            offset += len(chunk)
+        for column in columns.values():
+            column.flush()
+        del columns
+        if offset != n_samples:
+            raise ValueError(f"Ожидалось {n_samples} строк, прочитано {offset}: "
+                             "проверьте переводы строк внутри кавычек в CSV")
+        return offset
+
+    pa = _import_pyarrow()
+    schema = pa.schema([(name, pa.from_numpy_dtype(dtypes[name])) for name in COLUMNS])
+    if fmt == 'parquet':
+        import pyarrow.parquet as pq
+
+        writer = pq.ParquetWriter(output, schema)
+    else:
+        writer = pa.ipc.new_file(output, schema)
+    rows = 0
+    with writer:
+        for chunk in chunks():
+            arrays = [pa.array(_chunk_column(chunk, name, dtypes[name])) for name in COLUMNS]
+            writer.write_table(pa.Table.from_arrays(arrays, schema=schema))
+            rows += len(chunk)
+    return rows
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Конвертация CSV Hours/Scores в колоночный формат")
+    parser.add_argument('input', help="исходный CSV")
+    parser.add_argument('output', help="файл .parquet/.arrow/.feather или каталог для npy")
+    parser.add_argument('--to', choices=FORMATS[1:], help="формат назначения (по умолчанию — по расширению)")
+    parser.add_argument('--chunk-size', type=int, default=CONVERT_CHUNK_SIZE,
+                        help="число строк в блоке (по умолчанию %(default)s)")
+    parser.add_argument('--no-compact', action='store_true',
+                        help="хранить колонки в int64/float64, а не в uint8/float32")
+    args = parser.parse_args(argv)
+    try:
+        rows = convert_csv(args.input, args.output, args.to, args.chunk_size, compact=not args.no_compact)
+    except ValueError as e:
+        raise SystemExit(str(e))
+    print(f"✅ Сконвертировано строк: {rows} -> {args.output}")
+
+
+if __name__ == '__main__':
+    main()
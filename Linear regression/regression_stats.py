@@ -0,0 +1,504 @@
+"""Потоковая линейная регрессия по накопленным моментам.
+
+CSV читается блоками по ``chunk_size`` строк, и для каждого блока
+обновляются n, средние и центрированные суммы (по Уэлфорду/Чану). По ним
+считаются наклон, пересечение, R² и MSE — те же значения, что дают
+LinearRegression, r2_score и mean_squared_error на данных в памяти, без
+вектора предсказаний.
+"""
+
+import math
+from dataclasses import dataclass
+
+import numpy as np
+
+import profiling
+
+DEFAULT_CHUNK_SIZE = 1_000_000
+# Размер блока внутри RegressionStats.update: временные отклонения от среднего
+BLOCK_SIZE = 1 << 16
+# Параметры разбиения train/test, как в train_test_split(test_size=0.2, random_state=42)
+TEST_SIZE = 0.2
+RANDOM_STATE = 42
+# Режимы разбиения: random — как train_test_split, hash — по хэшу номера строки
+SPLITS = ('random', 'hash')
+NOT_FINITE_MESSAGE = "В колонках Hours и Scores есть пустые или нечисловые значения (NaN, бесконечность)"
+
+
+@dataclass
+class FitResult:
+    """Параметры модели и метрики на тестовой выборке."""
+
+    slope: float
+    intercept: float
+    r2: float
+    mse: float
+    n_train: int
+    n_test: int
+
+
+def block_moments(x, y):
+    """Моменты одного блока: (n, x̄, ȳ, Σ(x-x̄)², Σ(x-x̄)(y-ȳ), Σ(y-ȳ)²), счет в float64.
+
+    ValueError — если в блоке есть пропуск (NaN) или бесконечность, как у sklearn.
+    """
+    if len(x) == 0:
+        return 0, 0.0, 0.0, 0.0, 0.0, 0.0
+    bx = np.asarray(x, dtype=np.float64)
+    by = np.asarray(y, dtype=np.float64)
+    mean_x = float(bx.mean())
+    mean_y = float(by.mean())
+    # Среднее конечно, только если конечны все значения блока: отдельный проход не нужен
+    if not (math.isfinite(mean_x) and math.isfinite(mean_y)):
+        raise ValueError(NOT_FINITE_MESSAGE)
+    dx = bx - mean_x
+    dy = by - mean_y
+    return len(bx), mean_x, mean_y, float(np.dot(dx, dx)), float(np.dot(dx, dy)), float(np.dot(dy, dy))
+
+
+class RegressionStats:
+    """Накопленные моменты для простой регрессии y = slope * x + intercept.
+
+    Хранятся n, средние x̄, ȳ и центрированные суммы Σ(x-x̄)², Σ(x-x̄)(y-ȳ),
+    Σ(y-ȳ)². Блоки объединяются формулами Чана (параллельный вариант
+    Уэлфорда), поэтому большие суммы Σx² и Σy² не вычитаются друг из друга
+    и точность не теряется при сдвинутых данных.
+    """
+
+    __slots__ = ('n', 'mean_x', 'mean_y', 'cxx', 'cxy', 'cyy')
+
+    def __init__(self):
+        self.n = 0
+        self.mean_x = 0.0
+        self.mean_y = 0.0
+        self.cxx = 0.0
+        self.cxy = 0.0
+        self.cyy = 0.0
+
+    def _combine(self, n, mean_x, mean_y, cxx, cxy, cyy):
+        # Объединение с моментами другой части данных (формулы Чана)
+        if n == 0:
+            return
+        total = self.n + n
+        dx = mean_x - self.mean_x
+        dy = mean_y - self.mean_y
+        factor = self.n * n / total
+        self.mean_x += dx * n / total
+        self.mean_y += dy * n / total
+        self.cxx += cxx + dx * dx * factor
+        self.cxy += cxy + dx * dy * factor
+        self.cyy += cyy + dy * dy * factor
+        self.n = total
+
+    def update(self, x, y):
+        """Добавляет наблюдения (числовые массивы одинаковой длины).
+
+        Массив обрабатывается блоками по BLOCK_SIZE строк: отклонения от
+        среднего блока занимают немного памяти даже для очень длинных x и y.
+        Компактные колонки (float32, uint8) переводятся в float64 по блоку,
+        так что накопление всегда идет в float64.
+        """
+        for start in range(0, len(x), BLOCK_SIZE):
+            self._combine(*block_moments(x[start:start + BLOCK_SIZE], y[start:start + BLOCK_SIZE]))
+
+    def add_moments(self, moments):
+        """Добавляет моменты блока, посчитанные block_moments (например, в другом процессе)."""
+        self._combine(*moments)
+
+    def update_weighted(self, x, y, weights):
+        """Добавляет наблюдения с весами: целыми (кратности бутстрэпа) или вещественными (IRLS).
+
+        При вещественных весах n — сумма весов.
+        """
+        for start in range(0, len(x), BLOCK_SIZE):
+            bx = np.asarray(x[start:start + BLOCK_SIZE], dtype=np.float64)
+            by = np.asarray(y[start:start + BLOCK_SIZE], dtype=np.float64)
+            bw = weights[start:start + BLOCK_SIZE]
+            total = float(bw.sum())
+            if total == 0:
+                continue
+            mean_x = float(np.dot(bw, bx)) / total
+            mean_y = float(np.dot(bw, by)) / total
+            if not (math.isfinite(mean_x) and math.isfinite(mean_y)):
+                raise ValueError(NOT_FINITE_MESSAGE)
+            dx = bx - mean_x
+            dy = by - mean_y
+            wdx = bw * dx
+            self._combine(int(total) if bw.dtype.kind in 'iub' else total, mean_x, mean_y,
+                          float(np.dot(wdx, dx)), float(np.dot(wdx, dy)), float(np.dot(bw * dy, dy)))
+
+    def to_dict(self):
+        return {name: getattr(self, name) for name in self.__slots__}
+
+    @classmethod
+    def from_dict(cls, values):
+        stats = cls()
+        for name in cls.__slots__:
+            setattr(stats, name, values[name])
+        return stats
+
+    def merge(self, other):
+        """Добавляет моменты другого накопителя."""
+        self._combine(other.n, other.mean_x, other.mean_y, other.cxx, other.cxy, other.cyy)
+
+    def subtract(self, other):
+        """Убирает наблюдения другого накопителя (например, тестового фолда из всех данных).
+
+        other должен быть частью накопленных данных: это обращение формул Чана.
+        """
+        n = self.n - other.n
+        if n <= 0:
+            self.__init__()
+            return
+        mean_x = (self.n * self.mean_x - other.n * other.mean_x) / n
+        mean_y = (self.n * self.mean_y - other.n * other.mean_y) / n
+        dx = other.mean_x - mean_x
+        dy = other.mean_y - mean_y
+        factor = n * other.n / self.n
+        self.cxx -= other.cxx + dx * dx * factor
+        self.cxy -= other.cxy + dx * dy * factor
+        self.cyy -= other.cyy + dy * dy * factor
+        self.mean_x = mean_x
+        self.mean_y = mean_y
+        self.n = n
+
+    def fit(self):
+        """Возвращает (slope, intercept) по методу наименьших квадратов."""
+        if self.n == 0:
+            raise ValueError("Нет данных для обучения модели")
+        slope = self.cxy / self.cxx if self.cxx else 0.0
+        return slope, self.mean_y - slope * self.mean_x
+
+    def score(self, slope, intercept):
+        """Возвращает (r2, mse) модели на накопленных наблюдениях."""
+        if self.n == 0:
+            raise ValueError("Нет данных для оценки модели")
+        # SSE = Σ(y - slope*x - intercept)², разложенная через центрированные суммы
+        bias = self.mean_y - slope * self.mean_x - intercept
+        sse = self.cyy - 2 * slope * self.cxy + slope * slope * self.cxx + self.n * bias * bias
+        sse = max(sse, 0.0)
+        if self.cyy > 0:
+            r2 = 1 - sse / self.cyy
+        else:
+            # Поведение r2_score для константной целевой переменной
+            r2 = 1.0 if sse == 0 else 0.0
+        return r2, sse / self.n
+
+
+class StreamingMetrics:
+    """R² и MSE заданной модели по блокам, без вектора предсказаний целиком.
+
+    Среднее и Σ(y-ȳ)² (SST) целевой переменной обновляются по Уэлфорду/Чану,
+    SSE блоков складывается с компенсацией Кэхэна. Значения совпадают с
+    r2_score и mean_squared_error.
+    """
+
+    __slots__ = ('n', 'mean', 'sst', 'sse', '_sse_error')
+
+    def __init__(self):
+        self.n = 0
+        self.mean = 0.0
+        self.sst = 0.0
+        self.sse = 0.0
+        self._sse_error = 0.0
+
+    def _add_sse(self, value):
+        corrected = value - self._sse_error
+        total = self.sse + corrected
+        self._sse_error = (total - self.sse) - corrected
+        self.sse = total
+
+    def update(self, y_true, y_pred):
+        """Добавляет блок истинных значений и предсказаний."""
+        for start in range(0, len(y_true), BLOCK_SIZE):
+            by = np.asarray(y_true[start:start + BLOCK_SIZE], dtype=np.float64)
+            if len(by) == 0:
+                continue
+            residual = by - y_pred[start:start + BLOCK_SIZE]
+            self._add_sse(float(np.dot(residual, residual)))
+            mean = float(by.mean())
+            deviation = by - mean
+            n = len(by)
+            total = self.n + n
+            delta = mean - self.mean
+            self.sst += float(np.dot(deviation, deviation)) + delta * delta * self.n * n / total
+            self.mean += delta * n / total
+            self.n = total
+
+    def update_model(self, x, y, slope, intercept):
+        """Добавляет блок, предсказывая y по x моделью; предсказания живут только внутри блока."""
+        for start in range(0, len(x), BLOCK_SIZE):
+            by = y[start:start + BLOCK_SIZE]
+            self.update(by, slope * np.asarray(x[start:start + BLOCK_SIZE], dtype=np.float64) + intercept)
+
+    def result(self):
+        """Возвращает (r2, mse)."""
+        if self.n == 0:
+            raise ValueError("Нет данных для оценки модели")
+        if self.sst > 0:
+            r2 = 1 - self.sse / self.sst
+        else:
+            # Поведение r2_score для константной целевой переменной
+            r2 = 1.0 if self.sse == 0 else 0.0
+        return r2, self.sse / self.n
+
+
+class AlignedBlocks:
+    """Строки файла по блокам из BLOCK_SIZE строк, выровненным по номеру строки.
+
+    Для каждого полного блока запоминаются моменты его train- и test-строк
+    (block_moments); неполный блок ждет следующих строк. Границы блоков не
+    зависят от того, какими кусками приходят строки, поэтому последовательное
+    чтение блоками pandas и параллельное чтение по частям файла (shards.py)
+    дают одни и те же моменты, а reduce объединяет их в одном порядке —
+    результат совпадает до бита.
+    """
+
+    def __init__(self, start=0):
+        self.row = start
+        self.pending = []
+        self.moments = []
+
+    def add(self, x, y, in_test):
+        """Добавляет строки self.row, self.row+1, ... (x, y и маска теста одинаковой длины)."""
+        pos = 0
+        while pos < len(x):
+            take = min(BLOCK_SIZE - self.row % BLOCK_SIZE, len(x) - pos)
+            self.pending.append((x[pos:pos + take], y[pos:pos + take], in_test[pos:pos + take]))
+            self.row += take
+            pos += take
+            if self.row % BLOCK_SIZE == 0:
+                self._close_block()
+
+    def extend(self, moments):
+        """Добавляет моменты полных блоков, посчитанные в другом месте; начало должно быть на границе блока."""
+        if moments and (self.row % BLOCK_SIZE or self.pending):
+            raise ValueError("Моменты полных блоков можно добавить только на границе блока")
+        self.moments.extend(moments)
+        self.row += len(moments) * BLOCK_SIZE
+
+    def take_pending(self):
+        """Забирает строки неполного блока: (x, y, маска теста)."""
+        rows = self._pending_rows()
+        self.pending = []
+        return rows
+
+    def finish(self):
+        """Закрывает последний неполный блок (конец файла)."""
+        if self.pending:
+            self._close_block()
+
+    def reduce(self, train, test):
+        """Добавляет накопленные моменты к train и test по порядку строк и очищает их."""
+        for train_moments, test_moments in self.moments:
+            train.add_moments(train_moments)
+            test.add_moments(test_moments)
+        self.moments = []
+
+    def _pending_rows(self):
+        if len(self.pending) == 1:
+            return self.pending[0]
+        if not self.pending:
+            empty = np.empty(0)
+            return empty, empty, np.empty(0, dtype=bool)
+        return tuple(np.concatenate(parts) for parts in zip(*self.pending))
+
+    def _close_block(self):
+        x, y, in_test = self.take_pending()
+        self.moments.append((block_moments(x[~in_test], y[~in_test]), block_moments(x[in_test], y[in_test])))
+
+
+# Байты, из которых может состоять строка, пропускаемая pandas как пустая
+_BLANK_BYTES = b' \t\r\n'
+_IS_BLANK = np.zeros(256, dtype=bool)
+_IS_BLANK[list(_BLANK_BYTES)] = True
+
+
+def count_lines(data, has_text=False, block_size=1 << 20):
+    """Считает непустые строки в байтах data, как их считает pandas (пустые и из пробелов пропускаются).
+
+    has_text — есть ли текст в незаконченной строке перед data. Возвращает
+    (число непустых строк, законченных переводом строки; есть ли текст в
+    незаконченной строке в конце data).
+    """
+    lines = 0
+    for start in range(0, len(data), block_size):
+        block = data[start:start + block_size]
+        codes = np.frombuffer(block, dtype=np.uint8)
+        if not any(byte in block for byte in (b' ', b'\t', b'\r')):
+            # Обычный случай (без пробелов и \r, поиск memchr): пустые строки — только \n\n
+            newlines = codes == ord('\n')
+            empty = int(np.count_nonzero(newlines[1:] & newlines[:-1])) + bool(newlines[0] and not has_text)
+            lines += int(np.count_nonzero(newlines)) - empty
+            has_text = not newlines[-1]
+            continue
+        text = np.cumsum(~_IS_BLANK[codes], dtype=np.int64)
+        ends = np.flatnonzero(codes == ord('\n'))
+        if len(ends) == 0:
+            has_text = has_text or bool(text[-1])
+            continue
+        filled = np.diff(text[ends], prepend=0) > 0
+        filled[0] |= has_text
+        lines += int(np.count_nonzero(filled))
+        has_text = bool(text[-1] > text[ends[-1]])
+    return lines, has_text
+
+
+def count_rows(path, block_size=1 << 20):
+    """Считает строки данных в CSV (без заголовка и пустых строк), не загружая файл целиком."""
+    lines = 0
+    has_text = False
+    with open(path, 'rb') as f:
+        while True:
+            block = f.read(block_size)
+            if not block:
+                break
+            block_lines, has_text = count_lines(block, has_text, block_size)
+            lines += block_lines
+    return max(lines + has_text - 1, 0)
+
+
+def sklearn_test_mask(n_samples, test_size=0.2, random_state=42):
+    """Булева маска тестовых строк, совпадающая с train_test_split.
+
+    Повторяет ShuffleSplit: перестановка RandomState(random_state), первые
+    ceil(test_size * n) индексов — тест. Перестановка строится в int32,
+    если это возможно, так что на строку нужно 4 байта временно и 1 байт
+    на маску.
+    """
+    n_test = math.ceil(test_size * n_samples)
+    dtype = np.int32 if n_samples < 2**31 else np.int64
+    permutation = np.arange(n_samples, dtype=dtype)
+    np.random.RandomState(random_state).shuffle(permutation)
+    mask = np.zeros(n_samples, dtype=bool)
+    mask[permutation[:n_test]] = True
+    return mask
+
+
+def hash_test_mask(keys, test_size=0.2, random_state=42):
+    """Маска тестовых строк по хэшу (splitmix64) целочисленных ключей строк.
+
+    Строка попадает в тест, только если этого требует ее ключ: выборка не
+    зависит ни от других строк, ни от их порядка и числа.
+    """
+    z = np.asarray(keys).astype(np.uint64)
+    z += np.uint64((random_state * 0x9E3779B97F4A7C15) & 0xFFFFFFFFFFFFFFFF)
+    z ^= z >> np.uint64(30)
+    z *= np.uint64(0xBF58476D1CE4E5B9)
+    z ^= z >> np.uint64(27)
+    z *= np.uint64(0x94D049BB133111EB)
+    z ^= z >> np.uint64(31)
+    return (z >> np.uint64(11)) < np.uint64(int(test_size * 2**53))
+
+
+def stable_test_mask(start, count, test_size=0.2, random_state=42):
+    """Маска тестовых строк start..start+count-1, не зависящая от длины файла.
+
+    Ключ строки — ее номер, поэтому при дописывании строк в конец CSV уже
+    прочитанные строки не меняют выборку. Хэши считаются блоками: временная
+    память не растет с count.
+    """
+    mask = np.empty(count, dtype=bool)
+    for offset in range(0, count, DEFAULT_CHUNK_SIZE):
+        stop = min(offset + DEFAULT_CHUNK_SIZE, count)
+        keys = np.arange(start + offset, start + stop, dtype=np.uint64)
+        mask[offset:stop] = hash_test_mask(keys, test_size, random_state)
+    return mask
+
+
+def test_mask_for(n_samples, split='random', test_size=0.2, random_state=42):
+    """Маска тестовых строк для режима разбиения split ('random' или 'hash')."""
+    if split == 'hash':
+        return stable_test_mask(0, n_samples, test_size, random_state)
+    return sklearn_test_mask(n_samples, test_size, random_state)
+
+
+def fit_arrays(x, y, test_mask):
+    """Обучает модель и считает метрики по массивам в памяти.
+
+    Один проход по x и y дает суммы всех данных; тестовая часть выбирается
+    маской, а суммы train получаются вычитанием — train-копии не создаются.
+    Компактные колонки не копируются в float64 целиком: перевод идет по блокам.
+    """
+    with profiling.stage('fit'):
+        train = RegressionStats()
+        train.update(x, y)
+        test = RegressionStats()
+        test.update(x[test_mask], y[test_mask])
+        train.subtract(test)
+        slope, intercept = train.fit()
+    with profiling.stage('metrics'):
+        r2, mse = test.score(slope, intercept)
+    return FitResult(slope, intercept, r2, mse, train.n, test.n)
+
+
+def csv_blocks(path, chunk_size=DEFAULT_CHUNK_SIZE, test_size=0.2, random_state=42, split='random'):
+    """Читает CSV блоками по chunk_size строк: выдает (x, y, маска теста) в float64.
+
+    При split='hash' файл читается один раз: не нужны ни подсчет строк, ни
+    перестановка всех номеров — маска блока считается по номерам его строк.
+    """
+    import pandas as pd
+
+    n_samples = None
+    if split != 'hash':
+        n_samples = count_rows(path)
+        test_mask = sklearn_test_mask(n_samples, test_size, random_state)
+
+    offset = 0
+    reader = pd.read_csv(path, usecols=['Hours', 'Scores'], dtype='float64', chunksize=chunk_size)
+    for chunk in reader:
+        x = chunk['Hours'].to_numpy()
+        y = chunk['Scores'].to_numpy()
+        if n_samples is None:
+            in_test = stable_test_mask(offset, len(x), test_size, random_state)
+        else:
+            in_test = test_mask[offset:offset + len(x)]
+        offset += len(x)
+        yield x, y, in_test
+
+    if n_samples is not None and offset != n_samples:
+        raise ValueError(f"Ожидалось {n_samples} строк, прочитано {offset}: "
+                         "проверьте переводы строк внутри кавычек в CSV")
+
+
+def arrow_blocks(path, test_size=0.2, random_state=42, split='random'):
+    """Блоки записей файла Arrow IPC: (x, y, маска теста) в типах файла, без копий данных."""
+    from readers import arrow_batches, arrow_row_count
+
+    test_mask = None if split == 'hash' else sklearn_test_mask(arrow_row_count(path), test_size, random_state)
+    offset = 0
+    for x, y in arrow_batches(path):
+        if test_mask is None:
+            in_test = stable_test_mask(offset, len(x), test_size, random_state)
+        else:
+            in_test = test_mask[offset:offset + len(x)]
+        offset += len(x)
+        yield x, y, in_test
+
+
+def fit_blocks(blocks):
+    """Обучает модель и считает метрики по потоку блоков (x, y, маска теста) в порядке строк.
+
+    Моменты считаются по выровненным блокам строк (AlignedBlocks), поэтому
+    результат не зависит от размеров входных блоков: чтение CSV блоками pandas,
+    блоками записей Arrow и параллельное по частям (shards.fit_sharded)
+    совпадают.
+    """
+    train = RegressionStats()
+    test = RegressionStats()
+    aligned = AlignedBlocks()
+    for x, y, in_test in blocks:
+        aligned.add(x, y, in_test)
+        aligned.reduce(train, test)
+    aligned.finish()
+    aligned.reduce(train, test)
+
+    slope, intercept = train.fit()
+    r2, mse = test.score(slope, intercept)
+    return FitResult(slope, intercept, r2, mse, train.n, test.n)
+
+
+def fit_streaming(path, chunk_size=DEFAULT_CHUNK_SIZE, test_size=0.2, random_state=42, split='random'):
+    """Обучает модель и считает метрики, читая CSV блоками по chunk_size строк."""
+    return fit_blocks(csv_blocks(path, chunk_size, test_size, random_state, split))
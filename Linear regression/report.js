@@ -0,0 +1,293 @@
+        // Данные отчета (reportData) задаются на странице перед этим скриптом:
+        // колонки JS-массивами или, для выборки из больших данных и компактных колонок (часы во float32),
+        // Float32Array в base64; номера строк (Uint32Array) — только у выборки
+        function decodeColumn(base64, ArrayType) {
+            return new ArrayType(Uint8Array.from(atob(base64), c => c.charCodeAt(0)).buffer);
+        }
+        const packed = reportData.packed === true;
+        const hoursColumn = packed ? decodeColumn(reportData.hours, Float32Array) : reportData.hours;
+        const scoresColumn = packed ? decodeColumn(reportData.scores, Float32Array) : reportData.scores;
+        const rowNumbers = reportData.rows ? decodeColumn(reportData.rows, Uint32Array) : null;
+        // float32 хранит ~7 значащих цифр: 5.1 -> 5.099999904632568 -> 5.1
+        const formatValue = packed ? value => String(Number(value.toPrecision(7))) : value => String(value);
+
+        // Параметры модели из Python
+        const slope = reportData.slope;
+        const intercept = reportData.intercept;
+        // Остатки показанных строк и границы интервалов на сетке часов (Float32Array)
+        const residuals = decodeColumn(reportData.residuals, Float32Array);
+        const diagnostics = reportData.diagnostics;
+        const bands = diagnostics && {
+            meanLower: decodeColumn(diagnostics.meanLower, Float32Array),
+            meanUpper: decodeColumn(diagnostics.meanUpper, Float32Array),
+            lower: decodeColumn(diagnostics.lower, Float32Array),
+            upper: decodeColumn(diagnostics.upper, Float32Array),
+        };
+
+        // Номер узла сетки для часов; -1 — вне сетки
+        function gridIndex(hours) {
+            const index = Math.round((hours - diagnostics.gridStart) / diagnostics.gridStep);
+            return index >= 0 && index < bands.lower.length ? index : -1;
+        }
+
+        // На графике — не больше MAX_CHART_POINTS точек (каждая step-я строка): отрисовка
+        // сотен тысяч кругов заняла бы секунды, а таблица по-прежнему показывает все строки
+        const MAX_CHART_POINTS = 20000;
+        const chartStep = Math.max(1, Math.ceil(hoursColumn.length / MAX_CHART_POINTS));
+
+        // Минимум и максимум колонки циклом: Math.max(...column) на сотнях тысяч
+        // значений превышает размер стека
+        function columnRange(column) {
+            let min = Infinity;
+            let max = -Infinity;
+            for (let i = 0; i < column.length; i++) {
+                if (column[i] < min) min = column[i];
+                if (column[i] > max) max = column[i];
+            }
+            return [min, max];
+        }
+        const [hoursMin, hoursMax] = columnRange(hoursColumn);
+        const [scoresMin, scoresMax] = columnRange(scoresColumn);
+
+        // Таблица данных: в DOM находится только текущая страница строк
+        const PAGE_SIZE = 50;
+        const rowCount = hoursColumn.length;
+        const pageCount = Math.max(1, Math.ceil(rowCount / PAGE_SIZE));
+        let currentPage = 0;
+        let rowOrder = null;  // null — исходный порядок строк
+        let sortColumn = null;
+        let sortAscending = true;
+
+        function showPage(page) {
+            currentPage = Math.min(Math.max(page, 0), pageCount - 1);
+            const start = currentPage * PAGE_SIZE;
+            const end = Math.min(start + PAGE_SIZE, rowCount);
+            const rows = [];
+            for (let i = start; i < end; i++) {
+                const row = rowOrder ? rowOrder[i] : i;
+                const number = rowNumbers ? rowNumbers[row] : row + 1;
+                rows.push('<tr><td>' + number + '</td><td>' + formatValue(hoursColumn[row]) +
+                          '</td><td>' + formatValue(scoresColumn[row]) +
+                          '</td><td>' + residuals[row].toFixed(2) + '</td></tr>');
+            }
+            document.getElementById('tableBody').innerHTML = rows.join('');
+            document.getElementById('pageInfo').textContent = 'Страница ' + (currentPage + 1) + ' из ' + pageCount;
+            document.getElementById('firstPage').disabled = currentPage === 0;
+            document.getElementById('prevPage').disabled = currentPage === 0;
+            document.getElementById('nextPage').disabled = currentPage === pageCount - 1;
+            document.getElementById('lastPage').disabled = currentPage === pageCount - 1;
+            document.getElementById('dataTableWrapper').scrollTop = 0;
+        }
+
+        // Сортировка по колонке: повторный клик меняет направление
+        function sortTable(column) {
+            sortAscending = sortColumn === column ? !sortAscending : true;
+            sortColumn = column;
+            const values = column === 'hours' ? hoursColumn : scoresColumn;
+            const direction = sortAscending ? 1 : -1;
+            rowOrder = new Uint32Array(rowCount);
+            for (let i = 0; i < rowCount; i++) {
+                rowOrder[i] = i;
+            }
+            rowOrder.sort((a, b) => (values[a] - values[b]) * direction || a - b);
+            const mark = sortAscending ? '▲' : '▼';
+            document.getElementById('sortMarkHours').textContent = column === 'hours' ? mark : '';
+            document.getElementById('sortMarkScores').textContent = column === 'scores' ? mark : '';
+            showPage(0);
+        }
+
+        let canvas = document.getElementById('regressionChart');
+        let ctx = canvas.getContext('2d');
+
+        function resizeCanvas() {
+            const container = canvas.parentElement;
+            canvas.width = container.clientWidth - 60;
+            canvas.height = 500;
+        }
+
+        // Функция предсказания оценки
+        function predictScore() {
+            const hoursInput = document.getElementById('hoursInput');
+            const hours = parseFloat(hoursInput.value);
+            
+            if (isNaN(hours) || hours < 0) {
+                alert('⚠️ Пожалуйста, введите корректное количество часов (не менее 0)');
+                return;
+            }
+            
+            if (hours > 20) {
+                alert('⚠️ Введенное значение слишком большое. Обычно студенты занимаются не более 20 часов в день.');
+                return;
+            }
+            
+            // Вычисление предсказания по формуле линейной регрессии
+            const predictedScore = slope * hours + intercept;
+            
+            // Ограничение оценки в разумных пределах (0-100)
+            const finalScore = Math.max(0, Math.min(100, predictedScore));
+            
+            // Отображение результата
+            const resultBox = document.getElementById('resultBox');
+            const scoreElement = document.getElementById('predictedScore');
+            
+            scoreElement.textContent = finalScore.toFixed(2);
+            resultBox.classList.add('show');
+            
+            // Добавление эмодзи в зависимости от оценки
+            let emoji = '';
+            if (finalScore >= 90) emoji = '🌟';
+            else if (finalScore >= 75) emoji = '👍';
+            else if (finalScore >= 60) emoji = '✅';
+            else emoji = '📚';
+            
+            scoreElement.textContent = emoji + ' ' + finalScore.toFixed(2);
+
+            // Интервалы берутся из таблицы на сетке часов, без вычислений
+            const intervalElement = document.getElementById('predictedInterval');
+            const index = bands ? gridIndex(hours) : -1;
+            if (index < 0) {
+                intervalElement.textContent = '';
+                return;
+            }
+            const clip = value => Math.max(0, Math.min(100, value)).toFixed(1);
+            const level = Math.round(diagnostics.confidence * 100);
+            intervalElement.textContent = level + '% интервал предсказания: ' + clip(bands.lower[index]) +
+                ' – ' + clip(bands.upper[index]) + ' | среднее: ' + clip(bands.meanLower[index]) +
+                ' – ' + clip(bands.meanUpper[index]);
+        }
+
+        // Обработка Enter в поле ввода
+        document.getElementById('hoursInput').addEventListener('keypress', function(e) {
+            if (e.key === 'Enter') {
+                predictScore();
+            }
+        });
+
+        // Функция для отрисовки графика
+        function drawChart() {
+            resizeCanvas();
+            
+            const width = canvas.width;
+            const height = canvas.height;
+            const padding = 50;
+            
+            // Очистка canvas
+            ctx.clearRect(0, 0, width, height);
+            
+            // Определение масштаба
+            const maxX = hoursMax + 0.5;
+            const maxY = scoresMax + 5;
+            const minX = hoursMin - 0.5;
+            const minY = scoresMin - 5;
+            
+            const scaleX = (width - 2 * padding) / (maxX - minX);
+            const scaleY = (height - 2 * padding) / (maxY - minY);
+            
+            // Функция для преобразования координат
+            const toCanvasX = (x) => padding + (x - minX) * scaleX;
+            const toCanvasY = (y) => height - padding - (y - minY) * scaleY;
+            
+            // Рисование осей
+            ctx.strokeStyle = '#333';
+            ctx.lineWidth = 2;
+            ctx.beginPath();
+            ctx.moveTo(padding, height - padding);
+            ctx.lineTo(width - padding, height - padding);
+            ctx.moveTo(padding, padding);
+            ctx.lineTo(padding, height - padding);
+            ctx.stroke();
+            
+            // Метки осей
+            ctx.fillStyle = '#333';
+            ctx.font = 'bold 16px Arial';
+            ctx.textAlign = 'center';
+            ctx.fillText('Hours (Часы обучения)', width / 2, height - 10);
+            ctx.save();
+            ctx.translate(15, height / 2);
+            ctx.rotate(-Math.PI / 2);
+            ctx.fillText('Scores (Оценки)', 0, 0);
+            ctx.restore();
+            
+            // Полоса интервала предсказания по узлам сетки в пределах графика
+            if (bands) {
+                const nodes = [];
+                for (let i = 0; i < bands.lower.length; i++) {
+                    const x = diagnostics.gridStart + i * diagnostics.gridStep;
+                    if (x >= minX && x <= maxX) {
+                        nodes.push(i);
+                    }
+                }
+                if (nodes.length > 1) {
+                    const toY = value => toCanvasY(Math.max(minY, Math.min(maxY, value)));
+                    const gridX = i => toCanvasX(diagnostics.gridStart + i * diagnostics.gridStep);
+                    ctx.fillStyle = 'rgba(255, 0, 0, 0.12)';
+                    ctx.beginPath();
+                    nodes.forEach((i, k) => k === 0 ? ctx.moveTo(gridX(i), toY(bands.upper[i]))
+                                                    : ctx.lineTo(gridX(i), toY(bands.upper[i])));
+                    nodes.slice().reverse().forEach(i => ctx.lineTo(gridX(i), toY(bands.lower[i])));
+                    ctx.closePath();
+                    ctx.fill();
+                }
+            }
+
+            // Рисование линии регрессии
+            ctx.strokeStyle = '#ff0000';
+            ctx.lineWidth = 4;
+            ctx.setLineDash([]);
+            ctx.beginPath();
+            const startX = minX;
+            const startY = slope * startX + intercept;
+            const endX = maxX;
+            const endY = slope * endX + intercept;
+            ctx.moveTo(toCanvasX(startX), toCanvasY(startY));
+            ctx.lineTo(toCanvasX(endX), toCanvasY(endY));
+            ctx.stroke();
+            
+            // Рисование точек данных
+            ctx.fillStyle = '#667eea';
+            ctx.strokeStyle = '#fff';
+            ctx.lineWidth = 2;
+            for (let i = 0; i < hoursColumn.length; i += chartStep) {
+                ctx.beginPath();
+                ctx.arc(toCanvasX(hoursColumn[i]), toCanvasY(scoresColumn[i]), 7, 0, 2 * Math.PI);
+                ctx.fill();
+                ctx.stroke();
+            }
+            if (chartStep > 1) {
+                ctx.fillStyle = '#666';
+                ctx.font = '12px Arial';
+                ctx.textAlign = 'right';
+                ctx.fillText('На графике каждая ' + chartStep + '-я точка из ' + hoursColumn.length,
+                             width - padding, padding - 10);
+            }
+            
+            // Подписи делений на оси X
+            ctx.fillStyle = '#666';
+            ctx.font = '12px Arial';
+            ctx.textAlign = 'center';
+            for (let i = 0; i <= 10; i += 1) {
+                if (i >= Math.floor(minX) && i <= Math.ceil(maxX)) {
+                    ctx.fillText(i, toCanvasX(i), height - padding + 20);
+                }
+            }
+            
+            // Подписи делений на оси Y
+            ctx.textAlign = 'right';
+            for (let i = 0; i <= 100; i += 10) {
+                if (i >= Math.floor(minY) && i <= Math.ceil(maxY)) {
+                    ctx.fillText(i, padding - 10, toCanvasY(i) + 5);
+                }
+            }
+        }
+
+        // Инициализация: таблица раньше графика, и ошибка графика не оставляет ее пустой
+        function drawChartSafely() {
+            try {
+                drawChart();
+            } catch (error) {
+                console.error('Не удалось нарисовать график:', error);
+            }
+        }
+        showPage(0);
+        window.addEventListener('resize', drawChartSafely);
+        drawChartSafely();
@@ -0,0 +1,331 @@
+"""Генерация HTML отчета по результатам линейной регрессии.
+
+Разметка страницы лежит в report_template.html, стили и скрипт — в
+report.css и report.js. Шаблон читается и компилируется один раз на
+процесс — делится на неизменные куски и поля {{ name }} или
+{{ name:.2f }}, — а при каждом запуске подставляются только метрики и
+данные отчета: одна минифицированная строка reportData.
+
+CSS и JS встраиваются в страницу или, с assets_url, подключаются как
+общие файлы report.<версия>.css/.js: версия — хэш содержимого, поэтому
+файлы можно кэшировать навсегда, а тысячи отчетов хранят только данные.
+Отчет и общие файлы можно записать сжатыми заранее (gzip или brotli).
+"""
+
+import base64
+import gzip
+import hashlib
+import json
+import os
+import re
+import tempfile
+import time
+from functools import lru_cache
+
+import numpy as np
+
+from diagnostics import compute_diagnostics
+from regression_stats import RANDOM_STATE, TEST_SIZE, test_mask_for
+
+REPORT_DIR = os.path.dirname(os.path.abspath(__file__))
+TEMPLATE_PATH = os.path.join(REPORT_DIR, 'report_template.html')
+ASSETS = ('report.css', 'report.js')
+# Каталог общих CSS/JS рядом с отчетами
+ASSETS_DIRNAME = 'report-assets'
+COMPRESSIONS = ('gzip', 'brotli')
+_SUFFIXES = {'gzip': '.gz', 'brotli': '.br'}
+# Строки JSON с размером и временем записи каждого отчета
+MANIFEST_FILENAME = 'report_manifest.jsonl'
+# Поле шаблона: {{ name }} или {{ name:формат }}
+_FIELD = re.compile(r'\{\{ (\w+)(?::([^{}\s]+))? \}\}')
+
+DIAGNOSTICS_NOTE_TEMPLATE = """
+            <p>σ остатков: <strong>{d.residual_std:.2f}</strong> | Стандартная ошибка наклона: <strong>{d.slope_se:.4f}</strong>, пересечения: <strong>{d.intercept_se:.4f}</strong></p>"""
+ROBUST_DIAGNOSTICS_NOTE_TEMPLATE = """
+            <p>Модель обучена способом <strong>{}</strong>: интервалы предсказания и стандартные ошибки считаются только для МНК и не показываются.</p>"""
+# Способы обучения, для которых верны формулы интервалов (diagnostics.py)
+OLS_ENGINES = ('closed-form', 'sklearn')
+SAMPLE_NOTE_TEMPLATE = """
+            <p>На графике и в таблице показана случайная выборка: <strong>{}</strong> из <strong>{}</strong> точек. Линия регрессии и метрики рассчитаны по всем данным.</p>"""
+
+EVALUATION_TEMPLATE = """
+        <!-- Устойчивость метрик -->
+        <div class="info-card">
+            <h3>🎲 Устойчивость метрик</h3>
+            <div class="table-wrapper">
+                <table>
+                    <thead>
+                        <tr>
+                            <th>Метрика</th>
+                            <th>Кросс-валидация ({folds} фолдов): среднее ± σ</th>
+                            <th>Бутстрэп ({bootstrap} выборок): среднее [{level}% ДИ]</th>
+                        </tr>
+                    </thead>
+                    <tbody>{rows}
+                    </tbody>
+                </table>
+            </div>
+        </div>
+"""
+EVALUATION_ROW_TEMPLATE = """
+                        <tr>
+                            <td>{label}</td>
+                            <td>{cv.mean:{fmt}} ± {cv.std:{fmt}}</td>
+                            <td>{boot.mean:{fmt}} [{boot.low:{fmt}}; {boot.high:{fmt}}]</td>
+                        </tr>"""
+EVALUATION_LABELS = (
+    ('r2', 'R² Score', '.4f'),
+    ('mse', 'MSE', '.2f'),
+    ('slope', 'Наклон', '.4f'),
+    ('intercept', 'Пересечение', '.4f'),
+)
+
+
+def render_evaluation(evaluation):
+    """HTML блок со средними и доверительными интервалами метрик."""
+    if evaluation is None:
+        return ""
+    rows = "".join(
+        EVALUATION_ROW_TEMPLATE.format(label=label, fmt=fmt, cv=evaluation.cv[name], boot=evaluation.boot[name])
+        for name, label, fmt in EVALUATION_LABELS
+    )
+    return EVALUATION_TEMPLATE.format(folds=evaluation.folds, bootstrap=evaluation.bootstrap,
+                                      level=int(round(evaluation.confidence * 100)), rows=rows)
+
+
+@lru_cache(maxsize=None)
+def compile_template(path=TEMPLATE_PATH):
+    """Читает шаблон один раз и делит его на статичные куски и поля.
+
+    Возвращает (куски, поля), где поле — (имя, формат); кусков на один больше.
+    """
+    with open(path, encoding='utf-8') as f:
+        parts = _FIELD.split(f.read())
+    fields = tuple((parts[i], parts[i + 1] or '') for i in range(1, len(parts), 3))
+    return tuple(parts[0::3]), fields
+
+
+def render_template(values, path=TEMPLATE_PATH):
+    """Собирает страницу: статичные куски как есть, между ними — отформатированные значения."""
+    static, fields = compile_template(path)
+    pieces = [static[0]]
+    for (name, spec), chunk in zip(fields, static[1:]):
+        pieces.append(format(values[name], spec))
+        pieces.append(chunk)
+    return ''.join(pieces)
+
+
+@lru_cache(maxsize=None)
+def load_asset(name):
+    """Возвращает (текст, имя версионированного файла) общего CSS/JS."""
+    with open(os.path.join(REPORT_DIR, name), encoding='utf-8') as f:
+        text = f.read()
+    stem, ext = os.path.splitext(name)
+    version = hashlib.blake2b(text.encode('utf-8'), digest_size=4).hexdigest()
+    return text, f"{stem}.{version}{ext}"
+
+
+def render_assets(assets_url=None):
+    """Теги стилей и скрипта: встроенные или ссылки на общие файлы в assets_url."""
+    css, css_file = load_asset('report.css')
+    js, js_file = load_asset('report.js')
+    if assets_url is None:
+        return f"    <style>\n{css}    </style>", f"    <script>\n{js}    </script>"
+    prefix = assets_url.rstrip('/') + '/'
+    return (f'    <link rel="stylesheet" href="{prefix}{css_file}">',
+            f'    <script src="{prefix}{js_file}"></script>')
+
+
+def compress_bytes(data, method):
+    """Сжимает данные методом 'gzip' или 'brotli' с максимальной степенью."""
+    if method == 'gzip':
+        # mtime=0: одинаковый отчет дает одинаковые байты
+        return gzip.compress(data, compresslevel=9, mtime=0)
+    try:
+        import brotli
+    except ImportError as e:
+        raise ImportError("Для сжатия brotli нужен пакет brotli: pip install brotli") from e
+    return brotli.compress(data, quality=11)
+
+
+def write_assets(directory, compress=None):
+    """Пишет общие CSS/JS в directory, если файла этой версии еще нет. Возвращает пути."""
+    os.makedirs(directory, exist_ok=True)
+    paths = []
+    for name in ASSETS:
+        text, filename = load_asset(name)
+        path = os.path.join(directory, filename)
+        data = text.encode('utf-8')
+        targets = [(path, data)]
+        if compress:
+            targets.append((path + _SUFFIXES[compress], None))
+        for target, content in targets:
+            if not os.path.exists(target):
+                write_file_atomic(target, content if content is not None else compress_bytes(data, compress))
+            paths.append(target)
+    return paths
+
+
+def write_file_atomic(path, data):
+    """Пишет байты через временный файл в том же каталоге и os.replace.
+
+    Читатель видит либо старый файл, либо новый целиком, но не половину.
+    """
+    directory = os.path.dirname(path) or '.'
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix='.' + os.path.basename(path) + '.', suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(data)
+        # mkstemp создает файл с правами 0600; отчет должен читаться как обычный файл
+        os.chmod(tmp_path, 0o666 & ~_umask())
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+
+
+def _umask():
+    mask = os.umask(0)
+    os.umask(mask)
+    return mask
+
+
+def write_report_file(html_content, path, compress=None):
+    """Атомарно пишет отчет (сжатый — в path.gz или path.br) и возвращает сведения о записи.
+
+    Сведения: путь, размер файла и исходного HTML в байтах, сжатие и время
+    записи вместе со сжатием.
+    """
+    start = time.perf_counter()
+    data = html_content.encode('utf-8')
+    raw_bytes = len(data)
+    if compress:
+        data = compress_bytes(data, compress)
+        path += _SUFFIXES[compress]
+    write_file_atomic(path, data)
+    return {'path': path, 'bytes': len(data), 'raw_bytes': raw_bytes, 'compress': compress,
+            'write_s': round(time.perf_counter() - start, 6)}
+
+
+def append_manifest(directory, info):
+    """Дописывает строку со сведениями о записанном отчете в report_manifest.jsonl."""
+    record = dict(info, path=os.path.basename(info['path']), ts=round(time.time(), 3))
+    with open(os.path.join(directory, MANIFEST_FILENAME), 'a', encoding='utf-8') as f:
+        f.write(json.dumps(record) + '\n')
+
+
+def downsample(n_rows, max_points, random_state=42):
+    """Номера не более max_points из n_rows строк в исходном порядке."""
+    if max_points is None or n_rows <= max_points:
+        return np.arange(n_rows)
+    rng = np.random.default_rng(random_state)
+    return np.sort(rng.choice(n_rows, size=max_points, replace=False))
+
+
+def pack_column(values, dtype='<f4'):
+    """Кодирует колонку в base64 строку типизированного массива little-endian."""
+    return base64.b64encode(np.ascontiguousarray(values, dtype=dtype).tobytes()).decode('ascii')
+
+
+def json_column(values):
+    """Колонка списком для JSON; None, если float32 не записать коротко (5.099999904632568)."""
+    if values.dtype != np.float32:
+        return values.tolist()
+    # Компактные часы: float32 ближайший к числу с одним знаком после запятой
+    rounded = np.round(values.astype(np.float64), 1)
+    if np.array_equal(rounded.astype(np.float32), values):
+        return rounded.tolist()
+    return None
+
+
+def diagnostics_payload(diagnostics):
+    """Данные интервалов для reportData: сетка часов и границы как Float32Array в base64."""
+    if diagnostics is None:
+        return None
+    grid = diagnostics.grid
+    return {
+        'confidence': diagnostics.confidence,
+        'gridStart': float(grid[0]),
+        'gridStep': float(grid[1] - grid[0]),
+        'meanLower': pack_column(diagnostics.mean_lower),
+        'meanUpper': pack_column(diagnostics.mean_upper),
+        'lower': pack_column(diagnostics.lower),
+        'upper': pack_column(diagnostics.upper),
+    }
+
+
+def build_html(hours, scores, result, max_points=None, evaluation=None, assets_url=None, split='random',
+               engine='closed-form', test_mask=None):
+    """Собирает HTML отчет.
+
+    Данные встраиваются один раз, по колонкам; таблица на странице рисует
+    только текущую страницу строк. Если задан max_points, на график и в
+    таблицу попадает выборка из не более max_points строк, а колонки
+    встраиваются как base64 Float32Array/Uint32Array вместо JS-литералов.
+    Часы во float32 (компактное чтение CSV) попадают в JSON округленными до
+    0.1, если это их точное значение, иначе — тоже как Float32Array.
+    Метрики и сводная статистика всегда считаются по всем данным. Если передан
+    evaluation (evaluation.evaluate), добавляется блок с доверительными
+    интервалами метрик. С assets_url стили и скрипт не встраиваются, а
+    подключаются из общих файлов (write_assets).
+
+    Остатки показанных строк и интервалы предсказания на сетке часов
+    (diagnostics.compute_diagnostics) встраиваются как Float32Array.
+    Интервалы считаются только для МНК (engine из OLS_ENGINES) по обучающим
+    строкам: test_mask — маска, с которой обучена модель; без нее (модель из
+    кэша, train_test_split sklearn) маска строится заново по split.
+    """
+    slope, intercept, r2, mse = result.slope, result.intercept, result.r2, result.mse
+    hours = np.asarray(hours)
+    scores = np.asarray(scores)
+    n_rows = len(hours)
+
+    # Данные для HTML: колонки целиком, без iterrows, JSON без пробелов
+    diagnostics = None
+    if engine in OLS_ENGINES:
+        if test_mask is None:
+            test_mask = test_mask_for(n_rows, split, TEST_SIZE, RANDOM_STATE)
+        diagnostics = compute_diagnostics(hours, scores, result, test_mask)
+        diagnostics_note = DIAGNOSTICS_NOTE_TEMPLATE.format(d=diagnostics) if diagnostics else ""
+    else:
+        diagnostics_note = ROBUST_DIAGNOSTICS_NOTE_TEMPLATE.format(engine)
+    payload = {'slope': float(slope), 'intercept': float(intercept),
+               'diagnostics': diagnostics_payload(diagnostics)}
+    sample_note = ""
+    if max_points is None:
+        shown_hours, shown_scores = hours, scores
+    else:
+        shown = downsample(n_rows, max_points)
+        shown_hours, shown_scores = hours[shown], scores[shown]
+        payload['rows'] = pack_column(shown + 1, '<u4')
+        sample_note = SAMPLE_NOTE_TEMPLATE.format(len(shown), n_rows)
+    hours_list = json_column(hours) if max_points is None else None
+    if hours_list is not None:
+        payload.update(hours=hours_list, scores=scores.tolist())
+    else:
+        payload.update(packed=True, hours=pack_column(shown_hours), scores=pack_column(shown_scores))
+    # Остатки — в float64: float32 часов и uint8 оценок не должны задавать тип вычисления
+    fitted = slope * np.asarray(shown_hours, dtype=np.float64) + intercept
+    payload['residuals'] = pack_column(np.asarray(shown_scores, dtype=np.float64) - fitted)
+    styles, script = render_assets(assets_url)
+
+    # Генерация HTML: статичная часть страницы берется из скомпилированного шаблона
+    values = {
+        'styles': styles,
+        'r2': r2,
+        'mse': mse,
+        'slope': slope,
+        'intercept': intercept,
+        'evaluation': render_evaluation(evaluation),
+        'n_rows': n_rows,
+        'hours_min': hours.min(),
+        'hours_max': hours.max(),
+        'scores_mean': scores.mean(),
+        'n_train': result.n_train,
+        'n_test': result.n_test,
+        'sample_note': sample_note,
+        'diagnostics_note': diagnostics_note,
+        'data': json.dumps(payload, separators=(',', ':')),
+        'script': script,
+    }
+    return render_template(values)
@@ -0,0 +1,228 @@
+"""Регуляризованная и устойчивые к выбросам модели: Ridge, Huber, RANSAC.
+
+Все три способа обучения используют общее ядро. Источник данных отдает
+блоки (x, y, маска теста): срезы массивов в памяти или отображенных в
+память (npy) — ArraySource, блоки записей Arrow IPC без копирования —
+ArrowSource, либо блоки CSV — CSVSource. Первый
+проход накапливает моменты train и test (RegressionStats) и равномерную
+выборку строк train фиксированного размера (RowSample).
+
+- ridge — закрытая форма по моментам, один проход;
+- huber — IRLS: каждый шаг — проход с весами min(1, ε·σ/|r|), σ — MAD
+  остатков на выборке строк; не более max_iter шагов;
+- ransac — кандидаты по парам точек выборки, затем проход, в котором
+  прямая переобучается по строкам-инлайерам.
+
+R² и MSE на тесте считаются по моментам test для любой прямой, поэтому
+отдельного прохода для метрик нет.
+
+    python student_score.py --engine huber --data big_scores_npy
+"""
+
+import numpy as np
+
+from regression_stats import (BLOCK_SIZE, DEFAULT_CHUNK_SIZE, RANDOM_STATE, FitResult, RegressionStats,
+                              arrow_blocks, csv_blocks)
+
+ROBUST_ENGINES = ('ridge', 'huber', 'ransac')
+DEFAULT_ALPHA = 1.0
+DEFAULT_EPSILON = 1.35
+DEFAULT_MAX_ITER = 20
+DEFAULT_TOL = 1e-6
+RANSAC_TRIALS = 200
+# Размер выборки строк train для оценки масштаба остатков и кандидатов RANSAC
+SAMPLE_SIZE = 100_000
+# MAD нормального распределения: σ = MAD / 0.6745
+_MAD_TO_SIGMA = 1 / 0.6744897501960817
+
+
+class ArraySource:
+    """Блоки массивов в памяти или отображенных в память; маска теста задана целиком."""
+
+    def __init__(self, x, y, test_mask, block_size=DEFAULT_CHUNK_SIZE):
+        self.x = x
+        self.y = y
+        self.test_mask = test_mask
+        self.block_size = block_size
+        self.passes = 0
+
+    def blocks(self):
+        self.passes += 1
+        for start in range(0, len(self.x), self.block_size):
+            stop = start + self.block_size
+            # Копия float64 только одного блока: memmap не читается в память целиком
+            yield (np.asarray(self.x[start:stop], dtype=np.float64),
+                   np.asarray(self.y[start:stop], dtype=np.float64),
+                   self.test_mask[start:stop])
+
+
+class CSVSource:
+    """Блоки CSV: каждый проход заново читает файл, в памяти — один блок."""
+
+    def __init__(self, path, chunk_size=DEFAULT_CHUNK_SIZE, test_size=0.2, random_state=42, split='random'):
+        self.args = (path, chunk_size, test_size, random_state, split)
+        self.passes = 0
+
+    def blocks(self):
+        self.passes += 1
+        return csv_blocks(*self.args)
+
+
+class ArrowSource:
+    """Блоки записей Arrow IPC: файл отображен в память, в float64 переводится один блок."""
+
+    def __init__(self, path, test_size=0.2, random_state=42, split='random'):
+        self.args = (path, test_size, random_state, split)
+        self.passes = 0
+
+    def blocks(self):
+        self.passes += 1
+        for x, y, in_test in arrow_blocks(*self.args):
+            yield np.asarray(x, dtype=np.float64), np.asarray(y, dtype=np.float64), in_test
+
+
+class RowSample:
+    """Равномерная выборка не более size строк из потока блоков.
+
+    Каждой строке назначается случайный приоритет, хранятся size строк с
+    наименьшими приоритетами — как reservoir sampling, но блоками numpy.
+    """
+
+    def __init__(self, size=SAMPLE_SIZE, random_state=RANDOM_STATE):
+        self.size = size
+        self.rng = np.random.default_rng(random_state)
+        self.keys = np.empty(0)
+        self.x = np.empty(0)
+        self.y = np.empty(0)
+
+    def add(self, x, y):
+        keys = self.rng.random(len(x))
+        if len(self.keys) >= self.size:
+            # Строки с приоритетом выше худшего из выбранных в выборку не попадут
+            keep = keys < self.keys.max()
+            keys, x, y = keys[keep], x[keep], y[keep]
+        self.keys = np.concatenate([self.keys, keys])
+        self.x = np.concatenate([self.x, x])
+        self.y = np.concatenate([self.y, y])
+        if len(self.keys) > self.size:
+            chosen = np.argpartition(self.keys, self.size - 1)[:self.size]
+            self.keys, self.x, self.y = self.keys[chosen], self.x[chosen], self.y[chosen]
+
+
+def first_pass(source, sample_size=SAMPLE_SIZE, random_state=RANDOM_STATE):
+    """Проход по данным: возвращает (моменты train, моменты test, выборка строк train)."""
+    train = RegressionStats()
+    test = RegressionStats()
+    sample = RowSample(sample_size, random_state)
+    for x, y, in_test in source.blocks():
+        x_train, y_train = x[~in_test], y[~in_test]
+        train.update(x_train, y_train)
+        test.update(x[in_test], y[in_test])
+        if sample_size:
+            sample.add(x_train, y_train)
+    if train.n == 0:
+        raise ValueError("Нет данных для обучения модели")
+    return train, test, sample
+
+
+def _result(slope, intercept, train, test):
+    r2, mse = test.score(slope, intercept)
+    return FitResult(slope, intercept, r2, mse, train.n, test.n)
+
+
+def _mad_sigma(residual):
+    return float(np.median(np.abs(residual - np.median(residual)))) * _MAD_TO_SIGMA
+
+
+def fit_ridge(source, alpha=DEFAULT_ALPHA):
+    """Ridge: наклон Σ(x-x̄)(y-ȳ) / (Σ(x-x̄)² + α), пересечение не штрафуется (как sklearn Ridge)."""
+    train, test, _ = first_pass(source, sample_size=0)
+    denominator = train.cxx + alpha
+    slope = train.cxy / denominator if denominator else 0.0
+    return _result(slope, train.mean_y - slope * train.mean_x, train, test)
+
+
+def fit_huber(source, epsilon=DEFAULT_EPSILON, max_iter=DEFAULT_MAX_ITER, tol=DEFAULT_TOL):
+    """Huber через IRLS: старт с МНК, затем не более max_iter взвешенных проходов."""
+    train, test, sample = first_pass(source)
+    slope, intercept = train.fit()
+    for _ in range(max_iter):
+        sigma = _mad_sigma(sample.y - slope * sample.x - intercept)
+        if sigma == 0:
+            break
+        threshold = epsilon * sigma
+        weighted = RegressionStats()
+        for x, y, in_test in source.blocks():
+            x, y = x[~in_test], y[~in_test]
+            for start in range(0, len(x), BLOCK_SIZE):
+                bx = x[start:start + BLOCK_SIZE]
+                by = y[start:start + BLOCK_SIZE]
+                residual = np.abs(by - slope * bx - intercept)
+                weighted.update_weighted(bx, by, threshold / np.maximum(residual, threshold))
+        new_slope, new_intercept = weighted.fit()
+        converged = (abs(new_slope - slope) <= tol * (1 + abs(slope))
+                     and abs(new_intercept - intercept) <= tol * (1 + abs(intercept)))
+        slope, intercept = new_slope, new_intercept
+        if converged:
+            break
+    return _result(slope, intercept, train, test)
+
+
+def fit_ransac(source, trials=RANSAC_TRIALS, residual_threshold=None, random_state=RANDOM_STATE):
+    """RANSAC: лучшая из trials прямых по парам точек выборки, затем МНК по инлайерам.
+
+    Порог остатка по умолчанию — MAD целевой переменной, как у sklearn RANSACRegressor.
+    """
+    train, test, sample = first_pass(source, random_state=random_state)
+    if len(sample.x) < 2:
+        raise ValueError("Для RANSAC нужно хотя бы 2 строки в обучающей выборке")
+    if residual_threshold is None:
+        residual_threshold = float(np.median(np.abs(sample.y - np.median(sample.y))))
+
+    rng = np.random.default_rng(random_state)
+    first, second = rng.integers(0, len(sample.x), (2, trials))
+    dx = sample.x[second] - sample.x[first]
+    valid = dx != 0
+    slopes = (sample.y[second] - sample.y[first])[valid] / dx[valid]
+    intercepts = sample.y[first][valid] - slopes * sample.x[first][valid]
+    if len(slopes) == 0:
+        # Все x выборки одинаковы: прямая без наклона через медиану
+        slopes, intercepts = np.zeros(1), np.array([float(np.median(sample.y))])
+
+    best, best_inliers = 0, -1
+    for i, (slope, intercept) in enumerate(zip(slopes, intercepts)):
+        inliers = int(np.count_nonzero(np.abs(sample.y - slope * sample.x - intercept) <= residual_threshold))
+        if inliers > best_inliers:
+            best, best_inliers = i, inliers
+    slope, intercept = slopes[best], intercepts[best]
+
+    refit = RegressionStats()
+    for x, y, in_test in source.blocks():
+        x, y = x[~in_test], y[~in_test]
+        inliers = np.abs(y - slope * x - intercept) <= residual_threshold
+        refit.update(x[inliers], y[inliers])
+    if refit.n:
+        slope, intercept = refit.fit()
+    return _result(float(slope), float(intercept), train, test)
+
+
+def fit_engine(engine, source, alpha=DEFAULT_ALPHA, epsilon=DEFAULT_EPSILON, max_iter=DEFAULT_MAX_ITER):
+    """Обучает модель engine ('ridge', 'huber', 'ransac') по источнику блоков."""
+    if engine == 'ridge':
+        return fit_ridge(source, alpha)
+    if engine == 'huber':
+        return fit_huber(source, epsilon, max_iter)
+    if engine == 'ransac':
+        return fit_ransac(source)
+    raise ValueError(f"Неизвестный способ обучения: {engine}")
+
+
+def engine_label(engine, alpha=DEFAULT_ALPHA, epsilon=DEFAULT_EPSILON, max_iter=DEFAULT_MAX_ITER):
+    """Строка способа обучения и его параметров для ключа кэша; None для МНК."""
+    if engine == 'ridge':
+        return f"ridge(alpha={alpha!r})"
+    if engine == 'huber':
+        return f"huber(epsilon={epsilon!r},max_iter={max_iter})"
+    if engine == 'ransac':
+        return f"ransac(trials={RANSAC_TRIALS})"
+    return None
@@ -0,0 +1,307 @@
+"""Локальный HTTP сервис предсказаний по обученной модели.
+
+Модель загружается один раз из кэша, который заполняет student_score.py
+(или задается --slope/--intercept); обучение и отчет на запрос не
+выполняются. Сервис раз в --reload-interval секунд проверяет CSV и, если
+файл изменился и в кэше появилась новая модель, подменяет ее без
+перезапуска.
+
+    GET  /predict?hours=5.5            -> {"hours": 5.5, "score": 54.42}
+    POST /predict {"hours": 5.5}       -> {"hours": 5.5, "score": 54.42}
+    POST /predict {"hours": [1, 2.5]}  -> {"hours": [1, 2.5], "scores": [...]}
+    GET  /model                        -> параметры и метрики модели
+    GET  /health                       -> {"status": "ok"}
+
+    python serve.py --data student_scores.csv --port 8765
+"""
+
+import argparse
+import asyncio
+import json
+import math
+import os
+import sys
+import time
+from urllib.parse import parse_qs, urlsplit
+
+import numpy as np
+
+from model_cache import DEFAULT_CACHE_DIR, ModelCache, is_finite_result
+from predict import MAX_SCORE, MIN_SCORE, predict_scores
+from regression_stats import RANDOM_STATE, SPLITS, TEST_SIZE
+from robust import DEFAULT_ALPHA, DEFAULT_EPSILON, DEFAULT_MAX_ITER, ROBUST_ENGINES, engine_label
+
+MAX_HEADER_BYTES = 16 * 1024
+MAX_BODY_BYTES = 16 * 1024 * 1024
+
+_REASONS = {200: 'OK', 400: 'Bad Request', 404: 'Not Found', 405: 'Method Not Allowed',
+            413: 'Payload Too Large', 500: 'Internal Server Error', 503: 'Service Unavailable'}
+
+
+class HTTPError(Exception):
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+
+class ModelSource:
+    """Текущая модель и ее перезагрузка из кэша при изменении CSV."""
+
+    def __init__(self, data=None, cache_dir=DEFAULT_CACHE_DIR, slope=None, intercept=None, split='random',
+                 engine=None, compact=True):
+        self.data = data
+        self.split = split
+        # Способ обучения и его параметры (robust.engine_label); None — МНК
+        self.engine = engine
+        self.compact = compact
+        self.cache = ModelCache(cache_dir)
+        self.model = None
+        self.loaded_at = None
+        self._data_stat = None
+        self._key = None
+        if slope is not None:
+            self._set({'slope': slope, 'intercept': intercept, 'source': 'arguments'})
+
+    def _set(self, model):
+        self.model = model
+        self.loaded_at = time.time()
+
+    def reload(self):
+        """Проверяет CSV и кэш; возвращает True, если модель заменена."""
+        if self.data is None:
+            return False
+        try:
+            st = os.stat(self.data)
+        except OSError:
+            return False
+        stat = (st.st_mtime_ns, st.st_size)
+        if stat != self._data_stat:
+            # Хэш содержимого считается только когда CSV изменился
+            self._data_stat = stat
+            self._key = self.cache.key_for(self.data, TEST_SIZE, RANDOM_STATE, self.split, self.engine,
+                                           self.compact)
+        elif self.model is not None and self.model['key'] == self._key:
+            return False
+        result = self.cache.get(self._key)
+        if result is None or not is_finite_result(result):
+            # Новой модели в кэше еще нет (или она с NaN): продолжаем отвечать
+            # старой, а без нее — 503
+            return False
+        self._set({'slope': float(result.slope), 'intercept': float(result.intercept),
+                   'r2': float(result.r2), 'mse': float(result.mse),
+                   'n_train': result.n_train, 'n_test': result.n_test,
+                   'source': self.data, 'key': self._key})
+        return True
+
+    def describe(self):
+        info = {name: value for name, value in self.model.items() if name != 'key'}
+        info['loaded_at'] = self.loaded_at
+        return info
+
+
+def _parse_hours(value):
+    if isinstance(value, bool) or not isinstance(value, (int, float)):
+        raise HTTPError(400, "hours должно быть числом или списком чисел")
+    try:
+        # Целое из JSON может не поместиться во float (OverflowError)
+        value = float(value)
+    except (OverflowError, ValueError):
+        value = math.inf
+    if not math.isfinite(value):
+        raise HTTPError(400, "hours должно быть конечным числом")
+    return value
+
+
+def predict_payload(model, hours):
+    """Ответ /predict для одного значения или списка часов."""
+    slope = model['slope']
+    intercept = model['intercept']
+    if isinstance(hours, list):
+        values = [_parse_hours(value) for value in hours]
+        scores = predict_scores(values, slope, intercept)
+        return {'hours': values, 'scores': np.round(scores, 2).tolist()}
+    value = _parse_hours(hours)
+    # Одиночный запрос — без numpy: так быстрее для одного числа
+    score = min(max(value * slope + intercept, MIN_SCORE), MAX_SCORE)
+    return {'hours': value, 'score': round(score, 2)}
+
+
+class PredictionServer:
+    def __init__(self, source, reload_interval=1.0):
+        self.source = source
+        self.reload_interval = reload_interval
+
+    def handle(self, method, target, body):
+        """Возвращает (status, объект JSON) для запроса."""
+        url = urlsplit(target)
+        if url.path == '/health':
+            return 200, {'status': 'ok' if self.source.model else 'no model'}
+        if url.path not in ('/predict', '/model'):
+            raise HTTPError(404, f"Неизвестный путь {url.path}")
+        if self.source.model is None:
+            raise HTTPError(503, "Модель еще не обучена: запустите student_score.py")
+        if url.path == '/model':
+            return 200, self.source.describe()
+
+        if method == 'GET':
+            query = parse_qs(url.query)
+            if 'hours' not in query:
+                raise HTTPError(400, "Укажите параметр hours")
+            try:
+                hours = [float(value) for value in query['hours']]
+            except ValueError:
+                raise HTTPError(400, "hours должно быть числом")
+            return 200, predict_payload(self.source.model, hours[0] if len(hours) == 1 else hours)
+        if method == 'POST':
+            try:
+                payload = json.loads(body)
+            except ValueError:
+                raise HTTPError(400, "Тело запроса должно быть JSON")
+            if not isinstance(payload, dict) or 'hours' not in payload:
+                raise HTTPError(400, 'Ожидается JSON вида {"hours": 5.5} или {"hours": [1, 2]}')
+            return 200, predict_payload(self.source.model, payload['hours'])
+        raise HTTPError(405, f"Метод {method} не поддерживается")
+
+    async def _serve_connection(self, reader, writer):
+        try:
+            while True:
+                try:
+                    head = await reader.readuntil(b'\r\n\r\n')
+                except (asyncio.IncompleteReadError, ConnectionError):
+                    break
+                except asyncio.LimitOverrunError:
+                    await self._respond(writer, 413, {'error': "Слишком большие заголовки"}, False)
+                    break
+                request_line, *header_lines = head.decode('latin-1').split('\r\n')
+                try:
+                    method, target, version = request_line.split(' ', 2)
+                except ValueError:
+                    await self._respond(writer, 400, {'error': "Некорректная строка запроса"}, False)
+                    break
+                headers = {}
+                for line in header_lines:
+                    name, _, value = line.partition(':')
+                    if name:
+                        headers[name.strip().lower()] = value.strip()
+                keep_alive = (headers.get('connection', '').lower() != 'close'
+                              and version == 'HTTP/1.1')
+
+                try:
+                    length = int(headers.get('content-length', 0) or 0)
+                except ValueError:
+                    await self._respond(writer, 400, {'error': "Некорректный Content-Length"}, False)
+                    break
+                if length < 0 or length > MAX_BODY_BYTES:
+                    await self._respond(writer, 413, {'error': "Слишком большое тело запроса"}, False)
+                    break
+                body = await reader.readexactly(length) if length else b''
+                try:
+                    status, payload = self.handle(method, target, body)
+                except HTTPError as e:
+                    status, payload = e.status, {'error': str(e)}
+                except Exception as e:
+                    # Ошибка обработчика не должна обрывать соединение без ответа
+                    print(f"⚠️ Ошибка обработки {method} {target}: {type(e).__name__}: {e}", file=sys.stderr)
+                    status, payload = 500, {'error': "Внутренняя ошибка сервиса"}
+                await self._respond(writer, status, payload, keep_alive)
+                if not keep_alive:
+                    break
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+
+    async def _respond(self, writer, status, payload, keep_alive):
+        try:
+            # NaN и бесконечность — не JSON: лучше 500, чем ответ, который клиент не разберет
+            body = json.dumps(payload, ensure_ascii=False, allow_nan=False).encode('utf-8')
+        except ValueError:
+            print(f"⚠️ Нечисловое значение в ответе: {payload!r}", file=sys.stderr)
+            status = 500
+            body = json.dumps({'error': "Внутренняя ошибка сервиса"}, ensure_ascii=False).encode('utf-8')
+        head = (f"HTTP/1.1 {status} {_REASONS[status]}\r\n"
+                "Content-Type: application/json; charset=utf-8\r\n"
+                f"Content-Length: {len(body)}\r\n"
+                f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n")
+        writer.write(head.encode('latin-1') + body)
+        await writer.drain()
+
+    async def _watch(self):
+        while True:
+            await asyncio.sleep(self.reload_interval)
+            try:
+                # Хэш большого CSV считается в потоке, чтобы не блокировать запросы
+                reloaded = await asyncio.to_thread(self.source.reload)
+            except OSError as e:
+                print(f"⚠️ Не удалось перечитать модель: {e}", file=sys.stderr)
+                continue
+            if reloaded:
+                model = self.source.model
+                print(f"🔄 Модель обновлена: y = {model['slope']:.4f}x + {model['intercept']:.4f}",
+                      file=sys.stderr)
+
+    async def serve(self, host, port):
+        server = await asyncio.start_server(self._serve_connection, host, port, limit=MAX_HEADER_BYTES)
+        watcher = asyncio.create_task(self._watch()) if self.source.data else None
+        address = server.sockets[0].getsockname()
+        print(f"🚀 Сервис предсказаний: http://{address[0]}:{address[1]}/predict", file=sys.stderr)
+        try:
+            async with server:
+                await server.serve_forever()
+        finally:
+            if watcher:
+                watcher.cancel()
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="HTTP сервис предсказания оценок по обученной модели")
+    parser.add_argument('--data', help="CSV, на котором обучена модель: параметры берутся из кэша")
+    parser.add_argument('--slope', type=float, help="наклон модели (без перезагрузки)")
+    parser.add_argument('--intercept', type=float, help="пересечение модели")
+    parser.add_argument('--cache-dir', default=DEFAULT_CACHE_DIR,
+                        help="каталог кэша модели (по умолчанию %(default)s)")
+    parser.add_argument('--split', choices=SPLITS, default='random',
+                        help="разбиение, с которым обучена модель в кэше (по умолчанию %(default)s)")
+    parser.add_argument('--engine', choices=('closed-form', 'sklearn', *ROBUST_ENGINES), default='closed-form',
+                        help="способ обучения модели в кэше, как у student_score.py (по умолчанию %(default)s)")
+    parser.add_argument('--alpha', type=float, default=DEFAULT_ALPHA,
+                        help="--alpha модели ridge в кэше (по умолчанию %(default)s)")
+    parser.add_argument('--epsilon', type=float, default=DEFAULT_EPSILON,
+                        help="--epsilon модели huber в кэше (по умолчанию %(default)s)")
+    parser.add_argument('--max-iter', type=int, default=DEFAULT_MAX_ITER,
+                        help="--max-iter модели huber в кэше (по умолчанию %(default)s)")
+    parser.add_argument('--no-compact', action='store_true',
+                        help="модель в кэше обучена с --no-compact")
+    parser.add_argument('--host', default='127.0.0.1', help="адрес (по умолчанию %(default)s)")
+    parser.add_argument('--port', type=int, default=8765, help="порт (по умолчанию %(default)s)")
+    parser.add_argument('--reload-interval', type=float, default=1.0,
+                        help="как часто проверять изменение модели, секунд (по умолчанию %(default)s)")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    if (args.slope is None) != (args.intercept is None):
+        raise SystemExit("--slope и --intercept задаются вместе")
+    if args.slope is not None and not (math.isfinite(args.slope) and math.isfinite(args.intercept)):
+        raise SystemExit("--slope и --intercept должны быть конечными числами")
+    if args.slope is None and args.data is None:
+        raise SystemExit("Укажите --data для модели из кэша или --slope и --intercept")
+    if args.reload_interval <= 0:
+        raise SystemExit("--reload-interval должен быть положительным")
+
+    model = engine_label(args.engine, alpha=args.alpha, epsilon=args.epsilon, max_iter=args.max_iter)
+    source = ModelSource(None if args.slope is not None else args.data, args.cache_dir,
+                         args.slope, args.intercept, args.split, model, not args.no_compact)
+    source.reload()
+    if source.model is None:
+        print(f"⚠️ В кэше {args.cache_dir} нет модели для {args.data}: сервис ответит 503, "
+              "пока не будет запущен student_score.py", file=sys.stderr)
+    try:
+        asyncio.run(PredictionServer(source, args.reload_interval).serve(args.host, args.port))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == '__main__':
+    main()
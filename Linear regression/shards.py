@@ -0,0 +1,125 @@
+"""Параллельное обучение по частям CSV: разбор в пуле процессов.
+
+Файл делится по границам строк на части (shards) по SHARD_BYTES байт.
+Первый проход пула считает строки в каждой части: так каждая часть узнает
+номер своей первой строки, а значит и свою долю маски теста — срез маски
+train_test_split или хэши номеров строк (--split hash). Второй проход
+разбирает части pandas и сворачивает их в моменты блоков по BLOCK_SIZE
+строк, выровненных по номеру строки (regression_stats.AlignedBlocks).
+Строки на стыках частей — не больше блока с каждой стороны — возвращаются
+как есть и досчитываются в основном процессе. Моменты объединяются в
+порядке строк, поэтому наклон, пересечение, R² и MSE совпадают с
+последовательным --stream до бита.
+
+Части читаются с диска независимо: пока хватает ядер и диск успевает,
+скорость растет почти линейно с числом процессов. Номера строк считаются
+по непустым строкам (как их считает pandas), поэтому переводы строк
+внутри кавычек — ошибка (как у --stream с разбиением random).
+
+    python student_score.py --stream --workers 8
+"""
+
+import io
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from regression_stats import (BLOCK_SIZE, RANDOM_STATE, TEST_SIZE, AlignedBlocks, FitResult, RegressionStats,
+                              count_lines, sklearn_test_mask, stable_test_mask)
+
+# Размер части: в процессе пула одновременно разбирается одна часть
+SHARD_BYTES = 16 << 20
+
+
+def read_header(path):
+    """Имена колонок и смещение первой строки данных."""
+    with open(path, 'rb') as f:
+        header = f.readline()
+    names = header.decode('utf-8-sig').strip().split(',')
+    missing = {'Hours', 'Scores'} - set(names)
+    if missing:
+        raise ValueError(f"В {path} нет колонок: {', '.join(sorted(missing))}")
+    return names, len(header)
+
+
+def shard_ranges(path, data_start, shard_bytes=SHARD_BYTES):
+    """Границы частей [begin, end) в байтах: каждая часть начинается с новой строки."""
+    size = os.path.getsize(path)
+    bounds = [data_start]
+    with open(path, 'rb') as f:
+        for target in range(data_start + shard_bytes, size, shard_bytes):
+            if target <= bounds[-1]:
+                continue
+            # Граница сдвигается к концу строки, на которую попала
+            f.seek(target - 1)
+            f.readline()
+            bounds.append(min(f.tell(), size))
+    if bounds[-1] < size:
+        bounds.append(size)
+    return [(begin, end) for begin, end in zip(bounds, bounds[1:]) if end > begin]
+
+
+def _read_range(path, begin, end):
+    with open(path, 'rb') as f:
+        f.seek(begin)
+        return f.read(end - begin)
+
+
+def _count_lines(task):
+    # Первый проход: число непустых строк в части (последняя может не кончаться \n)
+    path, begin, end = task
+    lines, has_text = count_lines(_read_range(path, begin, end))
+    return lines + has_text
+
+
+def _reduce_shard(task):
+    """Второй проход: строки до первой границы блока, моменты полных блоков, строки после последней."""
+    import pandas as pd
+
+    path, begin, end, names, first_row, count, in_test, test_size, random_state = task
+    df = pd.read_csv(io.BytesIO(_read_range(path, begin, end)), header=None, names=names,
+                     usecols=['Hours', 'Scores'], dtype='float64')
+    x = df['Hours'].to_numpy()
+    y = df['Scores'].to_numpy()
+    if len(x) != count:
+        raise ValueError(f"В части файла с байта {begin} ожидалось {count} строк, прочитано {len(x)}: "
+                         "проверьте переводы строк внутри кавычек в CSV")
+    if in_test is None:
+        in_test = stable_test_mask(first_row, count, test_size, random_state)
+
+    head = min(count, -first_row % BLOCK_SIZE)
+    blocks = AlignedBlocks(first_row + head)
+    blocks.add(x[head:], y[head:], in_test[head:])
+    return (x[:head], y[:head], in_test[:head]), blocks.moments, blocks.take_pending()
+
+
+def fit_sharded(path, workers=None, test_size=TEST_SIZE, random_state=RANDOM_STATE, split='random',
+                shard_bytes=SHARD_BYTES):
+    """Обучает модель по CSV, разбирая его части в workers процессах; результат — как у fit_streaming."""
+    names, data_start = read_header(path)
+    ranges = shard_ranges(path, data_start, shard_bytes)
+    workers = min(workers or os.cpu_count() or 1, max(len(ranges), 1))
+
+    with ProcessPoolExecutor(workers) as pool:
+        counts = list(pool.map(_count_lines, [(path, begin, end) for begin, end in ranges]))
+        starts = np.concatenate([[0], np.cumsum(counts, dtype=np.int64)]).tolist()
+        test_mask = sklearn_test_mask(starts[-1], test_size, random_state) if split != 'hash' else None
+        tasks = [(path, begin, end, names, first_row, count,
+                  None if test_mask is None else test_mask[first_row:first_row + count], test_size, random_state)
+                 for (begin, end), first_row, count in zip(ranges, starts, counts)]
+        train = RegressionStats()
+        test = RegressionStats()
+        blocks = AlignedBlocks()
+        # map отдает части по порядку: стыки склеиваются, моменты объединяются в порядке строк
+        for head, moments, tail in pool.map(_reduce_shard, tasks, chunksize=max(1, len(tasks) // (4 * workers))):
+            blocks.add(*head)
+            blocks.extend(moments)
+            blocks.add(*tail)
+            blocks.reduce(train, test)
+    blocks.finish()
+    blocks.reduce(train, test)
+
+    slope, intercept = train.fit()
+    r2, mse = test.score(slope, intercept)
+    return FitResult(slope, intercept, r2, mse, train.n, test.n)
@@ -1,628 +1,412 @@
-import pandas as pd
-from sklearn.model_selection import train_test_split
-from sklearn.linear_model import LinearRegression
-from sklearn.metrics import mean_squared_error, r2_score
-import webbrowser
+# Тяжелые библиотеки (pandas, sklearn, webbrowser, пул процессов) импортируются
+# внутри функций, которым они нужны: маленький CSV и попадание в кэш
+# обрабатываются без pandas и sklearn.
+import argparse
 import os
-
-# Загрузка данных
-df = pd.read_csv('student_scores.csv')
-
-# Подготовка данных
-X = df[['Hours']]
-y = df['Scores']
-
-# Разделение данных
-X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, random_state=42)
-
-# Создание и обучение модели
-model = LinearRegression()
-model.fit(X_train, y_train)
-
-# Предсказания
-y_pred = model.predict(X_test)
-
-# Вычисление метрик
-r2 = r2_score(y_test, y_pred)
-mse = mean_squared_error(y_test, y_pred)
-slope = model.coef_[0]
-intercept = model.intercept_
-
-# Вывод результатов в консоль
-print("=" * 50)
-print("РЕЗУЛЬТАТЫ ЛИНЕЙНОЙ РЕГРЕССИИ")
-print("=" * 50)
-print(f"R² Score: {r2:.4f}")
-print(f"MSE: {mse:.2f}")
-print(f"Коэффициент (наклон): {slope:.4f}")
-print(f"Пересечение: {intercept:.4f}")
-print(f"Уравнение: y = {slope:.2f}x + {intercept:.2f}")
-print("=" * 50)
-
-# Подготовка данных для HTML
-data_points = []
-for _, row in df.iterrows():
-    data_points.append(f"{{hours: {row['Hours']}, score: {row['Scores']}}}")
-data_js = ",\n            ".join(data_points)
-
-# Подготовка таблицы данных
-table_rows = ""
-for idx, row in df.iterrows():
-    table_rows += f"""
-                <tr>
-                    <td>{idx + 1}</td>
-                    <td>{row['Hours']}</td>
-                    <td>{row['Scores']}</td>
-                </tr>"""
-
-# Генерация HTML
-html_content = f"""<!DOCTYPE html>
-<html lang="ru">
-<head>
-    <meta charset="UTF-8">
-    <meta name="viewport" content="width=device-width, initial-scale=1.0">
-    <title>Student Scores - Linear Regression Report</title>
-    <style>
-        * {{
-            margin: 0;
-            padding: 0;
-            box-sizing: border-box;
-        }}
-
-        body {{
-            font-family: 'Segoe UI', Tahoma, Geneva, Verdana, sans-serif;
-            background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
-            min-height: 100vh;
-            padding: 20px;
-        }}
-
-        .container {{
-            max-width: 1400px;
-            margin: 0 auto;
-        }}
-
-        h1 {{
-            color: white;
-            text-align: center;
-            margin-bottom: 30px;
-            font-size: 2.5em;
-            text-shadow: 2px 2px 4px rgba(0,0,0,0.3);
-        }}
-
-        .dashboard {{
-            display: grid;
-            grid-template-columns: 1fr 350px;
-            gap: 20px;
-            margin-bottom: 20px;
-        }}
-
-        .chart-container {{
-            background: white;
-            border-radius: 15px;
-            padding: 30px;
-            box-shadow: 0 10px 30px rgba(0,0,0,0.3);
-        }}
-
-        canvas {{
-            max-width: 100%;
-            height: auto;
-        }}
-
-        .metrics-panel {{
-            display: flex;
-            flex-direction: column;
-            gap: 20px;
-        }}
-
-        .metric-card {{
-            background: white;
-            border-radius: 15px;
-            padding: 25px;
-            box-shadow: 0 10px 30px rgba(0,0,0,0.3);
-            transition: transform 0.3s ease;
-        }}
-
-        .metric-card:hover {{
-            transform: translateY(-5px);
-        }}
-
-        .metric-title {{
-            font-size: 0.9em;
-            color: #666;
-            margin-bottom: 10px;
-            text-transform: uppercase;
-            letter-spacing: 1px;
-        }}
-
-        .metric-value {{
-            font-size: 2.5em;
-            font-weight: bold;
-            color: #667eea;
-        }}
-
-        .metric-description {{
-            font-size: 0.85em;
-            color: #999;
-            margin-top: 10px;
-        }}
-
-        .info-card {{
-            background: white;
-            border-radius: 15px;
-            padding: 20px;
-            box-shadow: 0 10px 30px rgba(0,0,0,0.3);
-            margin-top: 20px;
-        }}
-
-        .info-card h3 {{
-            color: #333;
-            margin-bottom: 15px;
-        }}
-
-        .info-card p {{
-            color: #666;
-            line-height: 1.6;
-        }}
-
-        /* Калькулятор предсказаний */
-        .predictor-card {{
-            background: white;
-            border-radius: 15px;
-            padding: 25px;
-            box-shadow: 0 10px 30px rgba(0,0,0,0.3);
-        }}
-
-        .predictor-card h3 {{
-            color: #333;
-            margin-bottom: 20px;
-            display: flex;
-            align-items: center;
-            gap: 10px;
-        }}
-
-        .form-group {{
-            margin-bottom: 20px;
-        }}
-
-        .form-group label {{
-            display: block;
-            color: #666;
-            margin-bottom: 8px;
-            font-weight: 600;
-        }}
-
-        .form-group input {{
-            width: 100%;
-            padding: 12px 15px;
-            border: 2px solid #e0e0e0;
-            border-radius: 8px;
-            font-size: 16px;
-            transition: border-color 0.3s;
-        }}
-
-        .form-group input:focus {{
-            outline: none;
-            border-color: #667eea;
-        }}
-
-        .predict-btn {{
-            width: 100%;
-            padding: 15px;
-            background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
-            color: white;
-            border: none;
-            border-radius: 8px;
-            font-size: 16px;
-            font-weight: bold;
-            cursor: pointer;
-            transition: transform 0.2s, box-shadow 0.2s;
-        }}
-
-        .predict-btn:hover {{
-            transform: translateY(-2px);
-            box-shadow: 0 5px 15px rgba(102, 126, 234, 0.4);
-        }}
-
-        .predict-btn:active {{
-            transform: translateY(0);
-        }}
-
-        .result-box {{
-            margin-top: 20px;
-            padding: 20px;
-            background: linear-gradient(135deg, #f5f7fa 0%, #c3cfe2 100%);
-            border-radius: 8px;
-            text-align: center;
-            display: none;
-        }}
-
-        .result-box.show {{
-            display: block;
-            animation: slideIn 0.3s ease;
-        }}
-
-        @keyframes slideIn {{
-            from {{
-                opacity: 0;
-                transform: translateY(-10px);
-            }}
-            to {{
-                opacity: 1;
-                transform: translateY(0);
-            }}
-        }}
-
-        .result-label {{
-            color: #666;
-            font-size: 14px;
-            margin-bottom: 5px;
-        }}
-
-        .result-value {{
-            font-size: 2.5em;
-            font-weight: bold;
-            color: #667eea;
-        }}
-
-        /* Таблица данных */
-        .data-table-card {{
-            background: white;
-            border-radius: 15px;
-            padding: 25px;
-            box-shadow: 0 10px 30px rgba(0,0,0,0.3);
-            margin-top: 20px;
-        }}
-
-        .data-table-card h3 {{
-            color: #333;
-            margin-bottom: 20px;
-            display: flex;
-            align-items: center;
-            gap: 10px;
-        }}
-
-        .table-wrapper {{
-            overflow-x: auto;
-            max-height: 400px;
-            overflow-y: auto;
-        }}
-
-        table {{
-            width: 100%;
-            border-collapse: collapse;
-        }}
-
-        th {{
-            background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
-            color: white;
-            padding: 12px;
-            text-align: left;
-            position: sticky;
-            top: 0;
-            z-index: 10;
-        }}
-
-        td {{
-            padding: 12px;
-            border-bottom: 1px solid #e0e0e0;
-            color: #333;
-        }}
-
-        tr:hover {{
-            background-color: #f5f5f5;
-        }}
-
-        tr:nth-child(even) {{
-            background-color: #fafafa;
-        }}
-
-        tr:nth-child(even):hover {{
-            background-color: #f0f0f0;
-        }}
-
-        .stats-summary {{
-            display: grid;
-            grid-template-columns: repeat(auto-fit, minmax(150px, 1fr));
-            gap: 15px;
-            margin-bottom: 20px;
-        }}
-
-        .stat-box {{
-            padding: 15px;
-            background: linear-gradient(135deg, #f5f7fa 0%, #c3cfe2 100%);
-            border-radius: 8px;
-            text-align: center;
-        }}
-
-        .stat-label {{
-            font-size: 12px;
-            color: #666;
-            margin-bottom: 5px;
-        }}
-
-        .stat-value {{
-            font-size: 1.8em;
-            font-weight: bold;
-            color: #667eea;
-        }}
-
-        @media (max-width: 1024px) {{
-            .dashboard {{
-                grid-template-columns: 1fr;
-            }}
-
-            .metrics-panel {{
-                grid-template-columns: repeat(2, 1fr);
-                display: grid;
-            }}
-        }}
-
-        @media (max-width: 768px) {{
-            .metrics-panel {{
-                grid-template-columns: 1fr;
-            }}
-        }}
-    </style>
-</head>
-<body>
-    <div class="container">
-        <h1>📊 Student Performance Analysis Report</h1>
-        
-        <div class="dashboard">
-            <div class="chart-container">
-                <canvas id="regressionChart"></canvas>
-            </div>
-            
-            <div class="metrics-panel">
-                <div class="metric-card">
-                    <div class="metric-title">R² Score (Точность)</div>
-                    <div class="metric-value">{r2:.4f}</div>
-                    <div class="metric-description">Коэффициент детерминации показывает, насколько хорошо модель описывает данные</div>
-                </div>
-                
-                <div class="metric-card">
-                    <div class="metric-title">MSE (Средняя квадратичная ошибка)</div>
-                    <div class="metric-value">{mse:.2f}</div>
-                    <div class="metric-description">Средняя квадратичная ошибка предсказаний модели</div>
-                </div>
-                
-                <div class="metric-card">
-                    <div class="metric-title">Уравнение</div>
-                    <div class="metric-value" style="font-size: 1.5em;">y = {slope:.2f}x + {intercept:.2f}</div>
-                    <div class="metric-description">Линейное уравнение регрессии</div>
-                </div>
-            </div>
-        </div>
-
-        <!-- Калькулятор предсказаний -->
-        <div class="predictor-card">
-            <h3>🎯 Предсказать свою оценку</h3>
-            <div class="form-group">
-                <label for="hoursInput">Сколько часов вы планируете заниматься?</label>
-                <input type="number" id="hoursInput" placeholder="Введите количество часов (например, 7.5)" step="0.1" min="0" max="20">
-            </div>
-            <button class="predict-btn" onclick="predictScore()">🔮 Предсказать оценку</button>
-            <div class="result-box" id="resultBox">
-                <div class="result-label">Предсказанная оценка:</div>
-                <div class="result-value" id="predictedScore">--</div>
-            </div>
-        </div>
-
-        <!-- Таблица данных -->
-        <div class="data-table-card">
-            <h3>📋 Данные для обучения модели</h3>
-            <div class="stats-summary">
-                <div class="stat-box">
-                    <div class="stat-label">Всего записей</div>
-                    <div class="stat-value">{len(df)}</div>
-                </div>
-                <div class="stat-box">
-                    <div class="stat-label">Мин. часов</div>
-                    <div class="stat-value">{df['Hours'].min():.1f}</div>
-                </div>
-                <div class="stat-box">
-                    <div class="stat-label">Макс. часов</div>
-                    <div class="stat-value">{df['Hours'].max():.1f}</div>
-                </div>
-                <div class="stat-box">
-                    <div class="stat-label">Средняя оценка</div>
-                    <div class="stat-value">{df['Scores'].mean():.1f}</div>
-                </div>
-            </div>
-            <div class="table-wrapper">
-                <table>
-                    <thead>
-                        <tr>
-                            <th>#</th>
-                            <th>Часы обучения</th>
-                            <th>Оценка</th>
-                        </tr>
-                    </thead>
-                    <tbody>{table_rows}
-                    </tbody>
-                </table>
-            </div>
-        </div>
-        
-        <div class="info-card">
-            <h3>ℹ️ Информация о данных</h3>
-            <p>Всего точек данных: <strong>{len(df)}</strong></p>
-            <p>Данные для обучения: <strong>{len(X_train)}</strong> | Данные для тестирования: <strong>{len(X_test)}</strong></p>
-            <p>Чтобы добавить новые данные, отредактируйте файл <strong>student_scores.csv</strong> и запустите скрипт снова.</p>
-        </div>
-    </div>
-
-    <script>
-        // Данные из CSV
-        let data = [
-            {data_js}
-        ];
-
-        let canvas = document.getElementById('regressionChart');
-        let ctx = canvas.getContext('2d');
-
-        function resizeCanvas() {{
-            const container = canvas.parentElement;
-            canvas.width = container.clientWidth - 60;
-            canvas.height = 500;
-        }}
-
-        // Параметры модели из Python
-        const slope = {slope};
-        const intercept = {intercept};
-
-        // Функция предсказания оценки
-        function predictScore() {{
-            const hoursInput = document.getElementById('hoursInput');
-            const hours = parseFloat(hoursInput.value);
-            
-            if (isNaN(hours) || hours < 0) {{
-                alert('⚠️ Пожалуйста, введите корректное количество часов (не менее 0)');
-                return;
-            }}
-            
-            if (hours > 20) {{
-                alert('⚠️ Введенное значение слишком большое. Обычно студенты занимаются не более 20 часов в день.');
-                return;
-            }}
-            
-            // Вычисление предсказания по формуле линейной регрессии
-            const predictedScore = slope * hours + intercept;
-            
-            // Ограничение оценки в разумных пределах (0-100)
-            const finalScore = Math.max(0, Math.min(100, predictedScore));
-            
-            // Отображение результата
-            const resultBox = document.getElementById('resultBox');
-            const scoreElement = document.getElementById('predictedScore');
-            
-            scoreElement.textContent = finalScore.toFixed(2);
-            resultBox.classList.add('show');
-            
-            // Добавление эмодзи в зависимости от оценки
-            let emoji = '';
-            if (finalScore >= 90) emoji = '🌟';
-            else if (finalScore >= 75) emoji = '👍';
-            else if (finalScore >= 60) emoji = '✅';
-            else emoji = '📚';
-            
-            scoreElement.textContent = emoji + ' ' + finalScore.toFixed(2);
-        }}
-
-        // Обработка Enter в поле ввода
-        document.getElementById('hoursInput').addEventListener('keypress', function(e) {{
-            if (e.key === 'Enter') {{
-                predictScore();
-            }}
-        }});
-
-        // Функция для отрисовки графика
-        function drawChart() {{
-            resizeCanvas();
-            
-            const width = canvas.width;
-            const height = canvas.height;
-            const padding = 50;
-            
-            // Очистка canvas
-            ctx.clearRect(0, 0, width, height);
-            
-            // Определение масштаба
-            const maxX = Math.max(...data.map(p => p.hours)) + 0.5;
-            const maxY = Math.max(...data.map(p => p.score)) + 5;
-            const minX = Math.min(...data.map(p => p.hours)) - 0.5;
-            const minY = Math.min(...data.map(p => p.score)) - 5;
-            
-            const scaleX = (width - 2 * padding) / (maxX - minX);
-            const scaleY = (height - 2 * padding) / (maxY - minY);
-            
-            // Функция для преобразования координат
-            const toCanvasX = (x) => padding + (x - minX) * scaleX;
-            const toCanvasY = (y) => height - padding - (y - minY) * scaleY;
-            
-            // Рисование осей
-            ctx.strokeStyle = '#333';
-            ctx.lineWidth = 2;
-            ctx.beginPath();
-            ctx.moveTo(padding, height - padding);
-            ctx.lineTo(width - padding, height - padding);
-            ctx.moveTo(padding, padding);
-            ctx.lineTo(padding, height - padding);
-            ctx.stroke();
-            
-            // Метки осей
-            ctx.fillStyle = '#333';
-            ctx.font = 'bold 16px Arial';
-            ctx.textAlign = 'center';
-            ctx.fillText('Hours (Часы обучения)', width / 2, height - 10);
-            ctx.save();
-            ctx.translate(15, height / 2);
-            ctx.rotate(-Math.PI / 2);
-            ctx.fillText('Scores (Оценки)', 0, 0);
-            ctx.restore();
-            
-            // Рисование линии регрессии
-            ctx.strokeStyle = '#ff0000';
-            ctx.lineWidth = 4;
-            ctx.setLineDash([]);
-            ctx.beginPath();
-            const startX = minX;
-            const startY = slope * startX + intercept;
-            const endX = maxX;
-            const endY = slope * endX + intercept;
-            ctx.moveTo(toCanvasX(startX), toCanvasY(startY));
-            ctx.lineTo(toCanvasX(endX), toCanvasY(endY));
-            ctx.stroke();
-            
-            // Рисование точек данных
-            data.forEach(point => {{
-                ctx.fillStyle = '#667eea';
-                ctx.beginPath();
-                ctx.arc(toCanvasX(point.hours), toCanvasY(point.score), 7, 0, 2 * Math.PI);
-                ctx.fill();
-                ctx.strokeStyle = '#fff';
-                ctx.lineWidth = 2;
-                ctx.stroke();
-            }});
-            
-            // Подписи делений на оси X
-            ctx.fillStyle = '#666';
-            ctx.font = '12px Arial';
-            ctx.textAlign = 'center';
-            for (let i = 0; i <= 10; i += 1) {{
-                if (i >= Math.floor(minX) && i <= Math.ceil(maxX)) {{
-                    ctx.fillText(i, toCanvasX(i), height - padding + 20);
-                }}
-            }}
-            
-            // Подписи делений на оси Y
-            ctx.textAlign = 'right';
-            for (let i = 0; i <= 100; i += 10) {{
-                if (i >= Math.floor(minY) && i <= Math.ceil(maxY)) {{
-                    ctx.fillText(i, padding - 10, toCanvasY(i) + 5);
-                }}
-            }}
-        }}
-
-        // Инициализация
-        window.addEventListener('resize', drawChart);
-        drawChart();
-    </script>
-</body>
-</html>"""
-
-# Сохранение HTML файла
-html_filename = 'regression_report.html'
-with open(html_filename, 'w', encoding='utf-8') as f:
-    f.write(html_content)
-
-print(f"\n✅ HTML отчет создан: {html_filename}")
-print("🌐 Открываю отчет в браузере...")
-
-# Открытие HTML файла в браузере
-webbrowser.open('file://' + os.path.realpath(html_filename))
-
-print("\n💡 Для обновления данных:")
-print("   1. Отредактируйте файл student_scores.csv")
-print("   2. Запустите этот скрипт снова")
-print("=" * 50)
\ No newline at end of file
+import time
+
+import profiling
+from model_cache import DEFAULT_CACHE_DIR, DEFAULT_MAX_ENTRIES, ModelCache
+from readers import detect_format, load_columns
+from regression_stats import (DEFAULT_CHUNK_SIZE, RANDOM_STATE, SPLITS, TEST_SIZE, FitResult, arrow_blocks,
+                              fit_arrays, fit_blocks, test_mask_for)
+from report import ASSETS_DIRNAME, COMPRESSIONS, append_manifest, build_html, write_assets, write_report_file
+from robust import (DEFAULT_ALPHA, DEFAULT_EPSILON, DEFAULT_MAX_ITER, ROBUST_ENGINES, ArraySource,
+                    ArrowSource, CSVSource, engine_label, fit_engine)
+
+DATA_FILE = 'student_scores.csv'
+HTML_FILENAME = 'regression_report.html'
+
+
+def fit_in_memory(path, engine='closed-form', split='random', engine_options=None, compact=True):
+    """Возвращает (часы, оценки, FitResult, маска теста обучения или None, если маски не было)."""
+    if detect_format(path) == 'arrow' and engine != 'sklearn':
+        # Обучение — по блокам записей отображенного файла, без склейки колонок;
+        # колонки целиком читаются только для отчета
+        result = fit_arrow(path, engine, split, engine_options)
+        hours, scores = load_columns(path)
+        return hours, scores, result, None
+
+    # Загрузка данных: CSV — в компактные типы (uint8/float32), суммы — в float64
+    hours, scores = load_columns(path, compact=compact)
+    if engine == 'sklearn' and split == 'random':
+        return hours, scores, fit_sklearn(hours, scores), None
+
+    # Одна независимая переменная: наклон и пересечение считаются в закрытой
+    # форме по суммам, разбиение — маской с тем же составом, что у train_test_split,
+    # или по хэшу номера строки
+    with profiling.stage('train_test_split'):
+        test_mask = test_mask_for(len(hours), split, TEST_SIZE, RANDOM_STATE)
+    if engine == 'sklearn':
+        return hours, scores, fit_sklearn(hours, scores, test_mask), test_mask
+    if engine in ROBUST_ENGINES:
+        return hours, scores, fit_robust(engine, ArraySource(hours, scores, test_mask), engine_options), test_mask
+    return hours, scores, fit_arrays(hours, scores, test_mask), test_mask
+
+
+def fit_arrow(path, engine='closed-form', split='random', engine_options=None):
+    if engine in ROBUST_ENGINES:
+        return fit_robust(engine, ArrowSource(path, TEST_SIZE, RANDOM_STATE, split), engine_options)
+    with profiling.stage('fit_arrow'):
+        return fit_blocks(arrow_blocks(path, TEST_SIZE, RANDOM_STATE, split))
+
+
+def fit_robust(engine, source, engine_options=None):
+    # Ridge, Huber и RANSAC: проходы по блокам источника (массивы в памяти,
+    # memmap или CSV), метрики — по моментам тестовой выборки
+    with profiling.stage('fit', engine=engine):
+        result = fit_engine(engine, source, **(engine_options or {}))
+    profiling.emit('engine', engine=engine, passes=source.passes)
+    return result
+
+
+def fit_sklearn(hours, scores, test_mask=None):
+    import numpy as np
+    import pandas as pd
+    from sklearn.model_selection import train_test_split
+    from sklearn.linear_model import LinearRegression
+    from sklearn.metrics import mean_squared_error, r2_score
+
+    # sklearn считает во входном типе: float32 часов дал бы float32-коэффициенты
+    df = pd.DataFrame({'Hours': np.asarray(hours, dtype=np.float64), 'Scores': scores})
+
+    # Подготовка данных
+    X = df[['Hours']]
+    y = df['Scores']
+
+    # Разделение данных
+    if test_mask is None:
+        with profiling.stage('train_test_split'):
+            X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=TEST_SIZE, random_state=RANDOM_STATE)
+    else:
+        X_train, X_test, y_train, y_test = X[~test_mask], X[test_mask], y[~test_mask], y[test_mask]
+
+    # Создание и обучение модели
+    with profiling.stage('fit'):
+        model = LinearRegression()
+        model.fit(X_train, y_train)
+
+    # Предсказания
+    with profiling.stage('predict'):
+        y_pred = model.predict(X_test)
+
+    # Вычисление метрик
+    with profiling.stage('metrics'):
+        r2 = r2_score(y_test, y_pred)
+        mse = mean_squared_error(y_test, y_pred)
+    slope = model.coef_[0]
+    intercept = model.intercept_
+    return FitResult(slope, intercept, r2, mse, len(X_train), len(X_test))
+
+
+def print_results(result):
+    # Вывод результатов в консоль
+    print("=" * 50)
+    print("РЕЗУЛЬТАТЫ ЛИНЕЙНОЙ РЕГРЕССИИ")
+    print("=" * 50)
+    print(f"R² Score: {result.r2:.4f}")
+    print(f"MSE: {result.mse:.2f}")
+    print(f"Коэффициент (наклон): {result.slope:.4f}")
+    print(f"Пересечение: {result.intercept:.4f}")
+    print(f"Уравнение: y = {result.slope:.2f}x + {result.intercept:.2f}")
+    print("=" * 50)
+
+
+def print_footer():
+    print("\n💡 Для обновления данных:")
+    print("   1. Отредактируйте файл student_scores.csv")
+    print("   2. Запустите этот скрипт снова")
+    print("=" * 50)
+
+
+def write_report(html_content, html_filename=HTML_FILENAME, open_browser=True, compress=None,
+                 external_assets=False):
+    # Сохранение HTML файла: как есть или заранее сжатым для веб-сервера
+    with profiling.stage('write', chars=len(html_content), compress=compress):
+        info = write_report_file(html_content, html_filename, compress)
+    directory = os.path.dirname(html_filename) or '.'
+    if external_assets:
+        write_assets(os.path.join(directory, ASSETS_DIRNAME), compress)
+    if compress or external_assets:
+        # Размер и время записи каждого отчета — в report_manifest.jsonl рядом с отчетом
+        append_manifest(directory, info)
+
+    print(f"\n✅ HTML отчет создан: {info['path']} ({info['bytes'] / 1024:.1f} КБ, "
+          f"запись {info['write_s'] * 1000:.1f} мс)")
+    if compress:
+        # Браузер не открывает сжатый файл с диска: его отдает веб-сервер
+        print(f"ℹ️ Отчет сжат ({compress}): исходный HTML — {info['raw_bytes'] / 1024:.1f} КБ")
+        return
+    if not open_browser:
+        return
+    print("🌐 Открываю отчет в браузере...")
+
+    # Открытие HTML файла в браузере
+    import webbrowser
+
+    webbrowser.open('file://' + os.path.realpath(html_filename))
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Линейная регрессия: часы обучения → оценка")
+    parser.add_argument('--data', default=DATA_FILE,
+                        help="данные с колонками Hours и Scores: CSV, .parquet, .arrow/.feather "
+                             "или каталог с Hours.npy и Scores.npy")
+    mode = parser.add_mutually_exclusive_group()
+    mode.add_argument('--stream', action='store_true',
+                      help="потоковый режим: читать CSV блоками с постоянным расходом памяти")
+    mode.add_argument('--incremental', action='store_true',
+                      help="инкрементальный режим: читать только строки, дописанные после прошлого запуска")
+    mode.add_argument('--watch', action='store_true',
+                      help="режим наблюдения: обновлять модель и отчет при каждом изменении CSV "
+                           "(дописанные строки — инкрементально), браузер открывается один раз")
+    parser.add_argument('--watch-interval', type=float, default=1.0,
+                        help="как часто проверять CSV в режиме --watch, секунд (по умолчанию %(default)s)")
+    parser.add_argument('--debounce', type=float, default=0.5,
+                        help="сколько секунд CSV должен не меняться перед обновлением в режиме --watch "
+                             "(по умолчанию %(default)s)")
+    parser.add_argument('--split', choices=SPLITS, default='random',
+                        help="разбиение train/test: random — как train_test_split, hash — по хэшу номера "
+                             "строки, дописанные строки не меняют выборку; --incremental всегда использует hash "
+                             "(по умолчанию %(default)s)")
+    parser.add_argument('--chunk-size', type=int, default=DEFAULT_CHUNK_SIZE,
+                        help="число строк в блоке для --stream и --incremental (по умолчанию %(default)s)")
+    parser.add_argument('--engine', choices=('closed-form', 'sklearn', *ROBUST_ENGINES), default='closed-form',
+                        help="как обучать модель: МНК по моментам (closed-form), sklearn LinearRegression, "
+                             "ridge, huber (IRLS) или ransac — устойчивые к выбросам (по умолчанию %(default)s)")
+    parser.add_argument('--alpha', type=float, default=DEFAULT_ALPHA,
+                        help="сила регуляризации для --engine ridge (по умолчанию %(default)s)")
+    parser.add_argument('--epsilon', type=float, default=DEFAULT_EPSILON,
+                        help="порог Huber в единицах масштаба остатков (по умолчанию %(default)s)")
+    parser.add_argument('--max-iter', type=int, default=DEFAULT_MAX_ITER,
+                        help="максимум проходов IRLS для --engine huber (по умолчанию %(default)s)")
+    parser.add_argument('--max-points', type=int, default=None,
+                        help="отчет для больших данных: не более N точек на графике и в таблице, "
+                             "точки встраиваются как base64 Float32Array")
+    parser.add_argument('--evaluate', action='store_true',
+                        help="k-fold кросс-валидация и бутстрэп: среднее и доверительный интервал метрик")
+    parser.add_argument('--folds', type=int, default=5, help="число фолдов для --evaluate (по умолчанию %(default)s)")
+    parser.add_argument('--bootstrap', type=int, default=200,
+                        help="число бутстрэп-выборок для --evaluate (по умолчанию %(default)s)")
+    parser.add_argument('--workers', type=int, default=None,
+                        help="число процессов для --evaluate и --batch (по умолчанию — число ядер); "
+                             "с --stream больше 1 — CSV разбирается частями параллельно, результат тот же")
+    parser.add_argument('--no-browser', action='store_true',
+                        help="не открывать отчет в браузере (cron, серверы без графики)")
+    parser.add_argument('--cache-dir', default=DEFAULT_CACHE_DIR,
+                        help="каталог кэша модели (по умолчанию %(default)s)")
+    parser.add_argument('--cache-size', type=int, default=DEFAULT_MAX_ENTRIES,
+                        help="максимальное число записей в кэше (по умолчанию %(default)s)")
+    parser.add_argument('--no-cache', action='store_true',
+                        help="всегда обучать модель заново, не читая и не записывая кэш")
+    parser.add_argument('--batch', metavar='PATH',
+                        help="пакетный режим: каталог или glob-шаблон с данными, по отчету на файл "
+                             "в пуле процессов, без браузера")
+    parser.add_argument('--output-dir', default='reports',
+                        help="каталог отчетов и index.html для --batch (по умолчанию %(default)s)")
+    parser.add_argument('--compress', choices=COMPRESSIONS,
+                        help="записывать отчеты заранее сжатыми (.html.gz или .html.br) для веб-сервера; "
+                             "браузер не открывается")
+    parser.add_argument('--no-compact', action='store_true',
+                        help="читать CSV в int64/float64, а не в компактные uint8/float32 "
+                             "(нужно, если часы заданы точнее 0.1 и важна каждая цифра)")
+    parser.add_argument('--external-assets', action='store_true',
+                        help="не встраивать CSS/JS в отчет, а подключать общие версионированные файлы "
+                             f"из каталога {ASSETS_DIRNAME} рядом с отчетом")
+    parser.add_argument('--profile', nargs='?', const='-', metavar='FILE',
+                        help="замеры этапов (время, CPU, пик памяти tracemalloc) строками JSON "
+                             "в FILE или в stderr")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+
+    if args.cache_size <= 0:
+        raise SystemExit("--cache-size должен быть положительным")
+    if args.max_points is not None and args.max_points <= 0:
+        raise SystemExit("--max-points должен быть положительным")
+    if args.chunk_size <= 0:
+        raise SystemExit("--chunk-size должен быть положительным")
+    if args.evaluate and (args.stream or args.incremental):
+        raise SystemExit("--evaluate работает только с данными в памяти (без --stream и --incremental)")
+    if args.bootstrap < 0 or (args.workers is not None and args.workers <= 0):
+        raise SystemExit("--bootstrap и --workers должны быть положительными")
+    if args.batch and (args.stream or args.incremental or args.evaluate):
+        raise SystemExit("--batch не сочетается с --stream, --incremental и --evaluate")
+    if args.engine in ROBUST_ENGINES and (args.incremental or args.evaluate or args.watch):
+        raise SystemExit("--incremental, --watch и --evaluate обучают только МНК: не сочетаются с --engine "
+                         + args.engine)
+    if args.stream and args.workers and args.workers > 1 and args.engine in ROBUST_ENGINES:
+        raise SystemExit("Параллельный --stream (--workers) обучает только МНК: не сочетается с --engine "
+                         + args.engine)
+    if args.watch and (args.batch or args.evaluate):
+        raise SystemExit("--watch не сочетается с --batch и --evaluate")
+    if args.watch_interval <= 0 or args.debounce < 0:
+        raise SystemExit("--watch-interval должен быть положительным, --debounce — неотрицательным")
+    if args.alpha < 0 or args.epsilon < 1 or args.max_iter <= 0:
+        raise SystemExit("Нужны --alpha >= 0, --epsilon >= 1 и положительный --max-iter")
+    if args.compress == 'brotli':
+        try:
+            import brotli  # noqa: F401
+        except ImportError:
+            raise SystemExit("Для --compress brotli нужен пакет brotli: pip install brotli")
+    if (args.incremental or args.watch) and detect_format(args.data) != 'csv':
+        raise SystemExit("--incremental и --watch читают только CSV")
+    if args.stream and detect_format(args.data) not in ('csv', 'arrow'):
+        raise SystemExit("--stream читает CSV и Arrow IPC")
+
+    if args.profile:
+        profiling.enable(args.profile)
+    try:
+        run(args)
+    except ValueError as e:
+        # Ошибки данных (пропуски, число строк) — сообщением, а не трассировкой;
+        # обучение падает раньше записи в кэш
+        raise SystemExit(str(e))
+    finally:
+        profiling.finish(data=args.data)
+
+
+def run(args):
+    engine_options = {'alpha': args.alpha, 'epsilon': args.epsilon, 'max_iter': args.max_iter}
+    model = engine_label(args.engine, **engine_options)
+    if args.batch:
+        from batch import expand_inputs, print_batch, run_batch
+
+        paths = expand_inputs(args.batch)
+        if not paths:
+            raise SystemExit(f"Нет файлов данных по пути {args.batch}")
+        summaries = run_batch(paths, args.output_dir, args.workers, args.engine, args.max_points,
+                              args.cache_dir, args.cache_size, args.no_cache, args.split, engine_options,
+                              args.compress, args.external_assets, not args.no_compact)
+        print_batch(summaries, args.output_dir)
+        return
+
+    if args.watch:
+        run_watch(args)
+        return
+
+    if args.incremental:
+        # Свое состояние вместо кэша по хэшу: хэш потребовал бы читать весь файл
+        from incremental import fit_incremental, state_path_for
+
+        state_path = state_path_for(args.data, args.cache_dir)
+        with profiling.stage('fit_incremental'):
+            result, mode, rows_read = fit_incremental(args.data, state_path, args.chunk_size,
+                                                      TEST_SIZE, RANDOM_STATE)
+        if mode == 'append':
+            print(f"➕ Дописано строк: {rows_read}, модель обновлена")
+        elif mode == 'unchanged':
+            print("♻️ Новых строк нет: модель взята из сохраненного состояния")
+        else:
+            print(f"🔄 Модель обучена по всему файлу ({rows_read} строк)")
+        print_results(result)
+        print("\nℹ️ Инкрементальный режим: HTML отчет не создается")
+        print_footer()
+        return
+
+    # Кэш модели: ключ — хэш содержимого CSV и параметры разбиения
+    cache = None if args.no_cache else ModelCache(args.cache_dir, args.cache_size)
+    with profiling.stage('cache_lookup'):
+        # Ключ зависит только от флагов запуска: predict.py и serve.py с теми же флагами найдут модель
+        cache_key = (cache.key_for(args.data, TEST_SIZE, RANDOM_STATE, args.split, model, not args.no_compact)
+                     if cache else None)
+        result = cache.get(cache_key) if cache else None
+    from_cache = result is not None
+    if from_cache:
+        print("♻️ Данные не изменились: модель и метрики взяты из кэша")
+
+    if args.stream:
+        if not from_cache:
+            if detect_format(args.data) == 'arrow':
+                # Блоки записей отображенного файла, без копирования колонок
+                result = fit_arrow(args.data, args.engine, args.split, engine_options)
+            elif args.engine in ROBUST_ENGINES:
+                source = CSVSource(args.data, args.chunk_size, TEST_SIZE, RANDOM_STATE, args.split)
+                result = fit_robust(args.engine, source, engine_options)
+            elif args.workers and args.workers > 1:
+                # Части файла разбираются в пуле процессов, моменты объединяются по порядку строк
+                from shards import fit_sharded
+
+                with profiling.stage('fit_sharded', workers=args.workers):
+                    result = fit_sharded(args.data, args.workers, TEST_SIZE, RANDOM_STATE, args.split)
+            else:
+                from regression_stats import fit_streaming
+
+                with profiling.stage('fit_streaming'):
+                    result = fit_streaming(args.data, args.chunk_size, TEST_SIZE, RANDOM_STATE, args.split)
+            if cache:
+                cache.put(cache_key, result, args.data)
+        print_results(result)
+        # HTML отчет содержит все строки данных, поэтому в потоковом режиме не создается
+        print("\nℹ️ Потоковый режим: HTML отчет не создается")
+    else:
+        test_mask = None
+        if from_cache:
+            # Обучение не нужно, данные читаются только для отчета
+            hours, scores = load_columns(args.data, compact=not args.no_compact)
+        else:
+            hours, scores, result, test_mask = fit_in_memory(args.data, args.engine, args.split, engine_options,
+                                                             not args.no_compact)
+            if cache:
+                cache.put(cache_key, result, args.data)
+        print_results(result)
+        evaluation = None
+        if args.evaluate:
+            from evaluation import evaluate, print_evaluation
+
+            try:
+                with profiling.stage('evaluate'):
+                    evaluation = evaluate(hours, scores, args.folds, args.bootstrap,
+                                          args.workers, RANDOM_STATE)
+            except ValueError as e:
+                raise SystemExit(str(e))
+            print_evaluation(evaluation)
+        with profiling.stage('build_html'):
+            html_content = build_html(hours, scores, result, args.max_points, evaluation,
+                                      ASSETS_DIRNAME if args.external_assets else None, args.split, args.engine,
+                                      test_mask)
+        write_report(html_content, open_browser=not args.no_browser, compress=args.compress,
+                     external_assets=args.external_assets)
+
+    print_footer()
+
+
+def run_watch(args):
+    from incremental import fit_incremental, state_path_for
+    from watch import watch
+
+    state_path = state_path_for(args.data, args.cache_dir)
+    browser_opened = False
+
+    def refresh():
+        nonlocal browser_opened
+        print(f"\n🕒 {time.strftime('%H:%M:%S')} Обновление по {args.data}")
+        try:
+            with profiling.stage('fit_incremental'):
+                result, mode, rows_read = fit_incremental(args.data, state_path, args.chunk_size,
+                                                          TEST_SIZE, RANDOM_STATE)
+            hours, scores = load_columns(args.data, compact=not args.no_compact)
+        except (OSError, ValueError, KeyError) as e:
+            # Файл мог быть сохранен не до конца: прежний отчет остается на месте
+            print(f"⚠️ Не удалось прочитать данные, отчет не обновлен: {e}")
+            return
+        if mode == 'append':
+            print(f"➕ Дописано строк: {rows_read}, модель обновлена")
+        elif mode == 'full':
+            print(f"🔄 Модель обучена по всему файлу ({rows_read} строк)")
+        print_results(result)
+        with profiling.stage('build_html'):
+            # Инкрементальный режим всегда делит строки по хэшу
+            html_content = build_html(hours, scores, result, args.max_points,
+                                      assets_url=ASSETS_DIRNAME if args.external_assets else None, split='hash')
+        write_report(html_content, open_browser=not (args.no_browser or browser_opened),
+                     compress=args.compress, external_assets=args.external_assets)
+        browser_opened = True
+
+    watch(args.data, refresh, args.watch_interval, args.debounce)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,5 @@
+import os
+import sys
+
+# Модули проекта лежат плоско в каталоге выше, как их импортируют скрипты
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
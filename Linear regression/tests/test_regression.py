@@ -0,0 +1,98 @@
+"""Инварианты обучения: разбиение как у train_test_split, совпадение режимов
+обучения между собой и с sklearn.
+
+    python -m pytest tests
+"""
+
+import numpy as np
+import pytest
+
+from incremental import fit_incremental
+from regression_stats import fit_arrays, fit_streaming, sklearn_test_mask
+from shards import fit_sharded
+
+
+def write_scores(path, n_rows, seed=0, blank_every=None, header=True):
+    """Пишет CSV Hours,Scores из n_rows строк; blank_every — пустая строка после каждой такой."""
+    rng = np.random.default_rng(seed)
+    hours = rng.uniform(1, 10, n_rows).round(1)
+    scores = np.clip(hours * 9.7 + rng.normal(2, 5, n_rows), 0, 100).round().astype(int)
+    lines = ['Hours,Scores'] if header else []
+    for i, (h, s) in enumerate(zip(hours, scores)):
+        lines.append(f"{h},{s}")
+        if blank_every and i % blank_every == blank_every - 1:
+            lines.append('')
+    with open(path, 'a', encoding='utf-8') as f:
+        f.write('\n'.join(lines) + '\n')
+    return hours, scores
+
+
+@pytest.mark.parametrize('n_samples', [2, 5, 25, 1000, 12345])
+def test_sklearn_test_mask_matches_train_test_split(n_samples):
+    from sklearn.model_selection import train_test_split
+
+    _, test_index = train_test_split(np.arange(n_samples), test_size=0.2, random_state=42)
+    expected = np.zeros(n_samples, dtype=bool)
+    expected[test_index] = True
+    assert np.array_equal(sklearn_test_mask(n_samples, 0.2, 42), expected)
+
+
+@pytest.mark.parametrize('split', ['random', 'hash'])
+def test_sharded_matches_streaming_bit_for_bit(tmp_path, split):
+    path = tmp_path / 'scores.csv'
+    # Пустые строки (как лишняя в конце файла) pandas пропускает, счет строк — тоже
+    write_scores(path, 300_000, blank_every=997)
+    with open(path, 'a', encoding='utf-8') as f:
+        f.write('\n')
+    serial = fit_streaming(str(path), 70_000, split=split)
+    sharded = fit_sharded(str(path), 3, split=split, shard_bytes=500_000)
+    assert sharded == serial
+    assert serial.n_train + serial.n_test == 300_000
+
+
+def test_incremental_append_equals_full_refit(tmp_path):
+    path = tmp_path / 'scores.csv'
+    write_scores(path, 150_000, seed=1)
+    result, mode, _ = fit_incremental(str(path), str(tmp_path / 'state.json'))
+    assert mode == 'full'
+    # Маленький хвост разбирается модулем csv, большой — pandas
+    for seed, n_rows in ((2, 1000), (3, 120_000)):
+        write_scores(path, n_rows, seed=seed, header=False)
+        result, mode, rows_read = fit_incremental(str(path), str(tmp_path / 'state.json'))
+        assert (mode, rows_read) == ('append', n_rows)
+
+    full, mode, _ = fit_incremental(str(path), str(tmp_path / 'fresh.json'))
+    assert mode == 'full'
+    assert (result.n_train, result.n_test) == (full.n_train, full.n_test)
+    for name in ('slope', 'intercept', 'r2', 'mse'):
+        assert getattr(result, name) == pytest.approx(getattr(full, name), rel=1e-12)
+    streaming = fit_streaming(str(path), split='hash')
+    assert result.slope == pytest.approx(streaming.slope, rel=1e-12)
+
+
+def test_closed_form_matches_sklearn():
+    from sklearn.linear_model import LinearRegression
+    from sklearn.metrics import mean_squared_error, r2_score
+    from sklearn.model_selection import train_test_split
+
+    rng = np.random.default_rng(4)
+    hours = rng.uniform(1, 10, 50_000)
+    scores = hours * 9.7 + rng.normal(2, 5, len(hours))
+    X_train, X_test, y_train, y_test = train_test_split(hours.reshape(-1, 1), scores, test_size=0.2,
+                                                        random_state=42)
+    model = LinearRegression().fit(X_train, y_train)
+    y_pred = model.predict(X_test)
+
+    result = fit_arrays(hours, scores, sklearn_test_mask(len(hours), 0.2, 42))
+    assert (result.n_train, result.n_test) == (len(X_train), len(X_test))
+    assert result.slope == pytest.approx(model.coef_[0], rel=1e-10)
+    assert result.intercept == pytest.approx(model.intercept_, rel=1e-10)
+    assert result.r2 == pytest.approx(r2_score(y_test, y_pred), rel=1e-10)
+    assert result.mse == pytest.approx(mean_squared_error(y_test, y_pred), rel=1e-10)
+
+
+def test_fit_rejects_missing_values():
+    hours = np.array([1.0, 2.0, np.nan, 4.0, 5.0])
+    scores = np.array([10.0, 20.0, 30.0, 40.0, 50.0])
+    with pytest.raises(ValueError):
+        fit_arrays(hours, scores, sklearn_test_mask(len(hours), 0.2, 42))
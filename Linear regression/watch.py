@@ -0,0 +1,58 @@
+"""Режим наблюдения: модель и отчет обновляются при каждом изменении CSV.
+
+Файл опрашивается раз в interval секунд по времени изменения и размеру —
+без внешних зависимостей вроде inotify. Серия записей (редактор сохраняет
+файл по частям, скрипт дописывает строки) схлопывается: обновление
+начинается, только когда время изменения и размер не менялись debounce
+секунд. Что именно пересчитывать, решает вызывающий код
+(student_score.py: дописанный хвост — инкрементально, переписанный файл —
+целиком).
+
+    python student_score.py --watch
+"""
+
+import os
+import time
+
+
+def file_signature(path):
+    """(mtime_ns, размер) файла или None, если файла сейчас нет."""
+    try:
+        st = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return st.st_mtime_ns, st.st_size
+
+
+def wait_for_change(path, last, interval=1.0, debounce=0.5):
+    """Ждет, пока сигнатура файла отличится от last и продержится debounce секунд.
+
+    Возвращает новую сигнатуру. Пока файла нет (редактор заменяет его
+    переименованием), ожидание продолжается.
+    """
+    current = last
+    while current == last:
+        time.sleep(interval)
+        current = file_signature(path)
+    stable_since = time.monotonic()
+    while True:
+        time.sleep(min(interval, debounce))
+        signature = file_signature(path)
+        if signature != current:
+            current = signature
+            stable_since = time.monotonic()
+        elif current is not None and time.monotonic() - stable_since >= debounce:
+            return current
+
+
+def watch(path, refresh, interval=1.0, debounce=0.5):
+    """Вызывает refresh() сразу и после каждого изменения path, пока не нажат Ctrl+C."""
+    signature = file_signature(path)
+    refresh()
+    print(f"\n👀 Слежу за {path} (проверка раз в {interval:g} с, Ctrl+C — выход)")
+    try:
+        while True:
+            signature = wait_for_change(path, signature, interval, debounce)
+            refresh()
+    except KeyboardInterrupt:
+        print("\n👋 Наблюдение остановлено")